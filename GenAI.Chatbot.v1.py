@@ -17,13 +17,24 @@ from langchain.chains import ConversationalRetrievalChain
 from langchain.chat_models import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
 from langchain.prompts import PromptTemplate
+from langchain.callbacks.base import BaseCallbackHandler
 import tempfile
+import hashlib
+import hmac
 import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Built once per process instead of on every Streamlit rerun
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=1000,
+    chunk_overlap=200,
+    length_function=len,
+    separators=["\n\n", "\n", " ", ""]
+)
+
 # --- Load and Process PDFs ---
 def load_documents(uploaded_files):
     all_docs = []
@@ -37,12 +48,39 @@ def load_documents(uploaded_files):
         os.remove(tmp_file_path)
     return all_docs
 
+def get_knowledge_base_key(action_choice, storage_option, uploaded_files, vector_db_path):
+    """Identify the knowledge base a rerun would build: the chosen action and the uploads' content, or the saved index."""
+    if uploaded_files and action_choice != "💬 Chat with existing knowledge base":
+        digests = tuple(hashlib.sha256(f.getvalue()).hexdigest() for f in uploaded_files)
+        return (action_choice, storage_option, digests)
+    index_file = os.path.join(vector_db_path, "index.faiss")
+    return (action_choice, os.path.getmtime(index_file) if os.path.exists(index_file) else None)
+
+# --- Streaming ---
+class StreamlitTokenHandler(BaseCallbackHandler):
+    """Render streamed LLM tokens into a Streamlit placeholder as they arrive."""
+    def __init__(self, placeholder):
+        self.placeholder = placeholder
+        self.text = ""
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.text += token
+        self.placeholder.markdown(self.text + "▌")
+
 # --- Basic Authentication ---
 def authenticate():
+    if st.session_state.get("authed"):
+        return True
     st.sidebar.title("Login")
     username = st.sidebar.text_input("Username")
     password = st.sidebar.text_input("Password", type="password")
-    if username == "admin" and password == "password123":
+    # Credentials come from the environment; APP_PW_HASH is the SHA-256 hex digest of the password
+    app_user = os.getenv("APP_USER", "admin")
+    pw_hash = os.getenv("APP_PW_HASH", hashlib.sha256(b"password123").hexdigest())
+    user_ok = hmac.compare_digest(username.encode(), app_user.encode())
+    pw_ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), pw_hash.lower())
+    if user_ok and pw_ok:
+        st.session_state.authed = True
         return True
     else:
         st.sidebar.warning("Enter valid credentials")
@@ -72,15 +110,15 @@ def main():
     embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key)
 
     # Sidebar - Display existing database status and management options
+    existing_db = None
     if has_existing_db:
         st.sidebar.success("✅ Knowledge base available")
         
-        # Show basic stats if we can load the database
+        # Load the database once; the stats and the chat/update paths below reuse it
         try:
-            temp_embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
-            temp_db = FAISS.load_local(vector_db_path, temp_embeddings)
-            if hasattr(temp_db, 'index') and temp_db.index is not None:
-                doc_count = temp_db.index.ntotal
+            existing_db = FAISS.load_local(vector_db_path, embeddings)
+            if hasattr(existing_db, 'index') and existing_db.index is not None:
+                doc_count = existing_db.index.ntotal
                 st.sidebar.metric("📄 Document Chunks", doc_count)
         except:
             st.sidebar.info("📊 Stats unavailable")
@@ -113,7 +151,7 @@ def main():
     if action_choice == "💬 Chat with existing knowledge base":
         # Load existing database without requiring new uploads
         st.info("Loading existing knowledge base...")
-        db = FAISS.load_local(vector_db_path, embeddings)
+        db = existing_db if existing_db is not None else FAISS.load_local(vector_db_path, embeddings)
         st.success("✅ Knowledge base loaded successfully!")
         uploaded_files = None  # No new files needed
         
@@ -139,89 +177,107 @@ def main():
     # Process uploaded files or use existing database
     if uploaded_files or action_choice == "💬 Chat with existing knowledge base":
         
-        # Only process new files if they were uploaded
-        if uploaded_files and action_choice != "💬 Chat with existing knowledge base":
-            st.success("PDFs uploaded successfully. Processing...")
-            documents = load_documents(uploaded_files)
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            docs = text_splitter.split_documents(documents)
-        else:
-            docs = []  # No new documents to process
+        # Reruns for each question reuse the database, chain and memory built for
+        # the same knowledge base, so history is kept and nothing is re-embedded
+        kb_key = get_knowledge_base_key(action_choice, storage_option, uploaded_files, vector_db_path)
+        if st.session_state.get("kb_key") != kb_key:
+            # Only process new files if they were uploaded
+            if uploaded_files and action_choice != "💬 Chat with existing knowledge base":
+                st.success("PDFs uploaded successfully. Processing...")
+                documents = load_documents(uploaded_files)
+                docs = TEXT_SPLITTER.split_documents(documents)
+            else:
+                docs = []  # No new documents to process
         
-        # Handle vector database creation/loading based on user choice
-        if action_choice == "💬 Chat with existing knowledge base":
-            # Database already loaded above, no additional processing needed
-            pass
+            # Handle vector database creation/loading based on user choice
+            if action_choice == "💬 Chat with existing knowledge base":
+                # Database already loaded above, no additional processing needed
+                pass
             
-        elif storage_option == "Save to disk (persistent)":
-            # Create a directory for storing vector database
-            os.makedirs(vector_db_dir, exist_ok=True)
+            elif storage_option == "Save to disk (persistent)":
+                # Create a directory for storing vector database
+                os.makedirs(vector_db_dir, exist_ok=True)
             
-            if action_choice == "🆕 Start fresh (replace existing data)":
-                # Replace existing database
-                if docs:
-                    st.info("Creating new vector database (replacing existing)...")
-                    db = FAISS.from_documents(docs, embeddings)
-                    db.save_local(vector_db_path)
-                    st.success("✅ New knowledge base created!")
+                if action_choice == "🆕 Start fresh (replace existing data)":
+                    # Replace existing database
+                    if docs:
+                        st.info("Creating new vector database (replacing existing)...")
+                        db = FAISS.from_documents(docs, embeddings)
+                        db.save_local(vector_db_path)
+                        st.success("✅ New knowledge base created!")
+                    else:
+                        st.warning("Please upload PDF files to create a new knowledge base.")
+                        st.stop()
                 else:
-                    st.warning("Please upload PDF files to create a new knowledge base.")
-                    st.stop()
+                    # Add to existing or create new
+                    if has_existing_db and docs:
+                        st.info("Adding new documents to existing knowledge base...")
+                        db = existing_db if existing_db is not None else FAISS.load_local(vector_db_path, embeddings)
+                        # Embed only the new chunks and insert them in place - no second index to merge
+                        texts = [doc.page_content for doc in docs]
+                        db.add_embeddings(
+                            list(zip(texts, embeddings.embed_documents(texts))),
+                            metadatas=[doc.metadata for doc in docs]
+                        )
+                        st.success("✅ New documents added to existing knowledge base!")
+                    elif docs:
+                        st.info("Creating new vector database...")
+                        db = FAISS.from_documents(docs, embeddings)
+                        st.success("✅ New knowledge base created!")
+                    else:
+                        st.warning("Please upload PDF files to add to the knowledge base.")
+                        st.stop()
+                
+                    # Save the updated database to disk
+                    db.save_local(vector_db_path)
+                
             else:
-                # Add to existing or create new
-                if has_existing_db and docs:
-                    st.info("Adding new documents to existing knowledge base...")
-                    db = FAISS.load_local(vector_db_path, embeddings)
-                    new_db = FAISS.from_documents(docs, embeddings)
-                    db.merge_from(new_db)
-                    st.success("✅ New documents added to existing knowledge base!")
-                elif docs:
-                    st.info("Creating new vector database...")
+                # Memory-only storage (original behavior)
+                if docs:
+                    st.info("Creating vector database in memory...")
                     db = FAISS.from_documents(docs, embeddings)
-                    st.success("✅ New knowledge base created!")
+                    st.success("✅ Vector database created in memory (temporary)!")
                 else:
-                    st.warning("Please upload PDF files to add to the knowledge base.")
+                    st.warning("Please upload PDF files for memory-only mode.")
                     st.stop()
-                
-                # Save the updated database to disk
-                db.save_local(vector_db_path)
-                
-        else:
-            # Memory-only storage (original behavior)
-            if docs:
-                st.info("Creating vector database in memory...")
-                db = FAISS.from_documents(docs, embeddings)
-                st.success("✅ Vector database created in memory (temporary)!")
-            else:
-                st.warning("Please upload PDF files for memory-only mode.")
-                st.stop()
 
-        memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+            memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
 
-        # ✅ Fixed prompt template with proper variables for ConversationalRetrievalChain
-        custom_prompt = PromptTemplate(
-            input_variables=["context", "question"],
-            template="""
-                You are Gen AI, a helpful assistant that answers questions based on the uploaded PDF documents.
-                Use the following pieces of context to answer the question at the end.
-                If the answer is not in the documents, respond with "I don't know".
-                Be concise and to the point.
+            # ✅ Fixed prompt template with proper variables for ConversationalRetrievalChain
+            custom_prompt = PromptTemplate(
+                input_variables=["context", "question"],
+                template="""
+                    You are Gen AI, a helpful assistant that answers questions based on the uploaded PDF documents.
+                    Use the following pieces of context to answer the question at the end.
+                    If the answer is not in the documents, respond with "I don't know".
+                    Be concise and to the point.
 
-                Context: {context}
-                Question: {question}
+                    Context: {context}
+                    Question: {question}
 
-                Answer:"""
-        )
+                    Answer:"""
+            )
 
-        # Create QA chain, with custom prompt, memory, and retriever
-        qa_chain = ConversationalRetrievalChain.from_llm(
-            llm=ChatOpenAI(
-                openai_api_key=openai_api_key, 
-                model_name=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")),
-            retriever=db.as_retriever(),
-            memory=memory,
-            combine_docs_chain_kwargs={"prompt": custom_prompt}
-        )
+            # Create QA chain, with custom prompt, memory, and retriever
+            # The answer streams; question condensing uses a non-streaming model so its tokens never reach the UI
+            model_name = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+            st.session_state.qa_chain = ConversationalRetrievalChain.from_llm(
+                llm=ChatOpenAI(
+                    openai_api_key=openai_api_key, 
+                    model_name=model_name,
+                    streaming=True),
+                condense_question_llm=ChatOpenAI(
+                    openai_api_key=openai_api_key,
+                    model_name=model_name),
+                retriever=db.as_retriever(),
+                memory=memory,
+                combine_docs_chain_kwargs={"prompt": custom_prompt}
+            )
+            st.session_state.vector_db = db
+            st.session_state.kb_key = kb_key
+
+        db = st.session_state.vector_db
+        qa_chain = st.session_state.qa_chain
 
         # Display knowledge base info
         if hasattr(db, 'index') and db.index is not None:
@@ -232,9 +288,10 @@ def main():
         user_question = st.text_input("Your question:", placeholder="What would you like to know about your documents?")
         
         if user_question:
-            with st.spinner("🤔 Thinking..."):
-                response = qa_chain.run(user_question)
-            st.write("**Answer:**", response)
+            st.write("**Answer:**")
+            placeholder = st.empty()
+            response = qa_chain.run(user_question, callbacks=[StreamlitTokenHandler(placeholder)])
+            placeholder.write(response)
             
         # Add some helpful tips
         with st.expander("💡 Tips for better results"):
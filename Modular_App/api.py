@@ -21,15 +21,25 @@ Provides endpoints for document upload, chat interactions, and system management
 """
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
+import hashlib
+import hmac
 import os
+import shutil
 import tempfile
+import threading
+import time
 import uvicorn
+from cachetools import TTLCache
 from datetime import datetime, timedelta
 import logging
+import msgspec
+import orjson
 
 # JWT is optional - will use fallback if not available
 try:
@@ -41,8 +51,8 @@ except ImportError:
 # Import our modular components
 from .config import config_manager
 from .document_processor import document_processor
-from .vector_store import vector_store_manager
-from .chat_engine import chat_engine
+from .vector_store import VectorStoreManager, vector_store_manager
+from .chat_engine import ChatEngine
 from .multi_model_provider import multi_model_manager
 
 # Configure logging
@@ -50,6 +60,9 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # API Models
+# Request models validate untrusted client input. Hot responses are encoded
+# from msgspec structs (see below) and their pydantic models only document the
+# schema.
 class LoginRequest(BaseModel):
     """Login request model."""
     username: str
@@ -105,22 +118,88 @@ class ModelConfig(BaseModel):
     model: str
     embedding_model: Optional[str] = None
 
+# msgspec mirrors of the hot-path response models. The endpoints encode these
+# straight to JSON bytes; the Pydantic models above only document the schema.
+class ChatResponseStruct(msgspec.Struct):
+    """Chat response payload."""
+    response: str
+    session_id: str
+    timestamp: datetime
+    model_used: str
+    processing_time: float
+    sources: Optional[List[str]] = None
+
+class DocumentUploadStruct(msgspec.Struct):
+    """Document upload result payload."""
+    filename: str
+    status: str
+    message: str
+    document_count: Optional[int] = None
+    processing_time: Optional[float] = None
+
+class UploadBatchStruct(msgspec.Struct):
+    """Final /upload line reporting the knowledge base update."""
+    status: str
+    message: str
+    document_count: int
+    processing_time: float
+
+_json_encoder = msgspec.json.Encoder()
+
+def msgspec_response(content: Any) -> Response:
+    """Encode msgspec structs (or lists of them) into a JSON response."""
+    return Response(content=_json_encoder.encode(content), media_type="application/json")
+
+class MockUploadedFile:
+    """
+    Streamlit-UploadedFile-like view of an upload spooled to a temporary file.
+    
+    Bytes are read from the spool only when the document processor asks for them.
+    """
+    __slots__ = ("name", "size", "_file")
+    
+    def __init__(self, filename: str, file: Any):
+        self.name = filename
+        self.size = file.seek(0, os.SEEK_END)
+        self._file = file
+    
+    def read(self) -> bytes:
+        self._file.seek(0)
+        return self._file.read()
+    
+    def getvalue(self) -> bytes:
+        return self.read()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="GenAI PDF Chatbot API",
     description="REST API for the GenAI PDF Chatbot with multi-format document support",
     version="2.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
+)
+
+# Loaded vector database shared by read endpoints; mutations bump db_version
+app.state.db_version = 0
+app.state.db_cache = None  # (cache key, database)
+app.state.db_lock = asyncio.Lock()
+
+# CORS middleware: explicit allowlists (comma-separated CORS_ORIGINS) let
+# Starlette use precomputed headers, and max_age lets browsers cache preflights
+CORS_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:8501").split(",")
+    if origin.strip()
 )
 
-# CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "DELETE"),
+    allow_headers=("authorization", "content-type"),
+    max_age=86400,
 )
 
 # Security
@@ -131,6 +210,18 @@ SECRET_KEY = os.getenv("API_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
+# Uploads up to this size stay in memory; larger ones spill to a temp file
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("API_UPLOAD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Verified-token cache: SHA-256(token) -> (username, exp). Only successfully
+# decoded tokens are stored; set API_TOKEN_CACHE=0 to verify every request.
+TOKEN_CACHE_ENABLED = os.getenv("API_TOKEN_CACHE", "1") != "0"
+_token_cache = TTLCache(
+    maxsize=int(os.getenv("API_TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("API_TOKEN_CACHE_TTL", "5"))
+)
+_token_cache_lock = threading.Lock()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
     to_encode = data.copy()
@@ -139,34 +230,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     to_encode.update({"exp": expire})
-    try:
-        if JWT_AVAILABLE:
-            encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-            return encoded_jwt
-        else:
-            # Fallback if JWT not available - use simple token
-            return f"simple_token_{data.get('sub', 'user')}_{int(expire.timestamp())}"
-    except:
+    if not JWT_AVAILABLE:
         # Fallback if JWT not available - use simple token
         return f"simple_token_{data.get('sub', 'user')}_{int(expire.timestamp())}"
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Verify API token."""
     token = credentials.credentials
     
-    # Try JWT verification first
-    try:
-        if JWT_AVAILABLE:
+    # Recently verified tokens skip signature verification; expiry is still checked
+    cache_key = hashlib.sha256(token.encode()).digest()
+    if TOKEN_CACHE_ENABLED:
+        with _token_cache_lock:
+            cached = _token_cache.get(cache_key)
+        if cached is not None:
+            username, expires_at = cached
+            if expires_at is None or expires_at > time.time():
+                return username
+    
+    # Try JWT verification first; tokens that are not valid JWTs fall through
+    if JWT_AVAILABLE:
+        try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.PyJWTError:
+            payload = None
+        
+        if payload is not None:
             username: str = payload.get("sub")
             if username is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token"
                 )
+            if TOKEN_CACHE_ENABLED:
+                with _token_cache_lock:
+                    _token_cache[cache_key] = (username, payload.get("exp"))
             return username
-    except:
-        pass
     
     # Fallback to simple token verification
     expected_token = os.getenv("API_TOKEN", "admin-token")
@@ -178,14 +278,47 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
         detail="Invalid API token"
     )
 
+# Username -> SHA-256 hex digest of the password, computed once at import.
+# The admin login follows APP_USER / APP_PW_HASH like the Streamlit app.
+_USER_PASSWORD_HASHES = {
+    config_manager.get_app_user(): config_manager.get_app_password_hash(),
+    "user": hashlib.sha256(b"userpass").hexdigest()
+}
+
 def authenticate_user(username: str, password: str) -> bool:
     """Authenticate user credentials."""
     # Simple authentication - enhance for production
-    valid_users = {
-        "admin": "password123",
-        "user": "userpass"
-    }
-    return valid_users.get(username) == password
+    stored_hash = _USER_PASSWORD_HASHES.get(username)
+    if stored_hash is None:
+        return False
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored_hash)
+
+async def get_cached_database() -> Optional[Any]:
+    """
+    Get the vector database, loading it from disk only when it changed.
+    
+    The cache is keyed by db_version and the database type. The lock keeps
+    concurrent requests from loading the same index twice.
+    """
+    cache_key = (app.state.db_version, vector_store_manager.current_db_type)
+    cached = app.state.db_cache
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+    
+    async with app.state.db_lock:
+        cached = app.state.db_cache
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        
+        db = await run_in_threadpool(vector_store_manager.load_database)
+        if db:
+            app.state.db_cache = (cache_key, db)
+        return db
+
+def invalidate_database_cache() -> None:
+    """Drop the cached vector database after it was modified."""
+    app.state.db_version += 1
+    app.state.db_cache = None
 
 # API Endpoints
 
@@ -211,175 +344,298 @@ async def login_for_access_token(login_request: LoginRequest):
         expires_in=ACCESS_TOKEN_EXPIRE_HOURS * 3600  # in seconds
     )
 
-@app.get("/", response_model=Dict[str, str])
+# Constant payloads serialized once; /health only splices in the timestamp
+_ROOT_BYTES = orjson.dumps({
+    "message": "GenAI PDF Chatbot API",
+    "version": "2.1.0",
+    "docs": "/docs"
+})
+
+@app.get("/", responses={200: {"model": Dict[str, str]}})
 async def root():
     """Root endpoint."""
-    return {
-        "message": "GenAI PDF Chatbot API",
-        "version": "2.1.0",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
-@app.get("/health", response_model=Dict[str, str])
+@app.get("/health", responses={200: {"model": Dict[str, str]}})
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": str(datetime.now())}
+    return Response(
+        content=f'{{"status":"healthy","timestamp":"{datetime.now()}"}}'.encode(),
+        media_type="application/json"
+    )
 
-@app.get("/status", response_model=SystemStatus)
+# Status fields that only change between deploys, filled in at startup
+_STATUS_STATIC: Dict[str, Any] = {}
+_document_count_cache = TTLCache(maxsize=4, ttl=1)
+
+@app.on_event("startup")
+async def precompute_static_status() -> None:
+    """Compute the invariant /status fields once."""
+    _STATUS_STATIC.update({
+        "version": config_manager.app_config.APP_VERSION,
+        "available_providers": multi_model_manager.get_available_providers(),
+        "supported_formats": document_processor.get_supported_formats(),
+        "supported_languages": dict(config_manager.get_supported_languages())
+    })
+
+@app.get("/status", responses={200: {"model": SystemStatus}})
 async def get_system_status(token: str = Depends(verify_token)):
     """Get system status and configuration."""
     try:
-        # Get document count from current vector database
-        db = vector_store_manager.load_database()
-        doc_count = vector_store_manager.get_document_count(db) if db else 0
+        # Get document count from current vector database (cached for one second)
+        count_key = (app.state.db_version, vector_store_manager.current_db_type)
+        doc_count = _document_count_cache.get(count_key)
+        if doc_count is None:
+            db = await get_cached_database()
+            doc_count = vector_store_manager.get_document_count(db) if db else 0
+            _document_count_cache[count_key] = doc_count
         
-        return SystemStatus(
-            version=config_manager.app_config.APP_VERSION,
-            available_providers=multi_model_manager.get_available_providers(),
-            database_type=vector_store_manager.current_db_type or "not_set",
-            document_count=doc_count,
-            supported_formats=document_processor.get_supported_formats(),
-            supported_languages=config_manager.get_supported_languages()
-        )
+        return ORJSONResponse({
+            **_STATUS_STATIC,
+            "database_type": vector_store_manager.current_db_type or "not_set",
+            "document_count": doc_count
+        })
     except Exception as e:
         logger.error(f"Error getting system status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/upload", response_model=List[DocumentUploadResponse])
-async def upload_documents(
-    files: List[UploadFile] = File(...),
-    database_type: str = "faiss",
-    token: str = Depends(verify_token)
-):
-    """Upload and process documents."""
-    responses = []
-    start_time = datetime.now()
+# Load, merge and save must not interleave: the last save would drop the
+# chunks another upload merged into its own copy of the index
+_db_write_lock = threading.Lock()
+
+def _get_request_store_manager(database_type: str) -> VectorStoreManager:
+    """Build a store manager bound to one request's database type."""
+    manager = VectorStoreManager()
+    manager.set_database_type(database_type)
+    manager.set_embedding_backend(vector_store_manager.embedding_backend)
+    return manager
+
+def _merge_and_save(manager: VectorStoreManager, split_docs: List[Any]) -> None:
+    """Add chunks to the persisted database (creating it if needed) and save it."""
+    with _db_write_lock:
+        existing_db = manager.load_database(writable=True)
+        
+        if existing_db:
+            # Add to existing database
+            final_db = manager.merge_databases(existing_db, split_docs)
+        else:
+            # Create new database
+            final_db = manager.create_database(split_docs)
+        
+        manager.save_database(final_db)
+        
+        # Reads follow the knowledge base that was just written
+        vector_store_manager.set_database_type(manager.current_db_type)
+
+async def _upload_events(manager: VectorStoreManager, spooled_files: List[tuple], start_time: float):
+    """
+    Process spooled uploads and yield one NDJSON line per file as it finishes.
+    
+    A final line reports the single merge/save of all chunks into the
+    knowledge base. Spools are closed even if the client disconnects.
+    """
+    all_split_docs = []
     
     try:
-        # Set database type
-        vector_store_manager.set_database_type(database_type)
-        
-        for file in files:
+        for filename, spool, spool_error in spooled_files:
+            if spool_error is not None:
+                yield _json_encoder.encode(DocumentUploadStruct(
+                    filename=filename,
+                    status="error",
+                    message=spool_error
+                )) + b"\n"
+                continue
+            
             try:
-                # Create temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-                    content = await file.read()
-                    tmp_file.write(content)
-                    tmp_file_path = tmp_file.name
-                
                 # Create UploadFile-like object for processing
-                class MockUploadedFile:
-                    def __init__(self, filename, content):
-                        self.name = filename
-                        self.size = len(content)
-                        self._content = content
-                    
-                    def read(self):
-                        return self._content
-                    
-                    def getvalue(self):
-                        return self._content
-                
-                mock_file = MockUploadedFile(file.filename, content)
+                mock_file = MockUploadedFile(filename, spool)
                 
                 # Validate file
                 is_valid, error_msg = document_processor.validate_file(mock_file)
                 if not is_valid:
-                    responses.append(DocumentUploadResponse(
-                        filename=file.filename,
+                    result = DocumentUploadStruct(
+                        filename=filename,
                         status="error",
                         message=error_msg
-                    ))
-                    continue
-                
-                # Process document
-                docs = document_processor._process_single_file(mock_file)
-                split_docs = document_processor.split_documents(docs)
-                
-                # Load existing database or create new one
-                existing_db = vector_store_manager.load_database()
-                
-                if existing_db:
-                    # Add to existing database
-                    vector_store_manager.merge_databases(existing_db, split_docs)
-                    final_db = existing_db
+                    )
                 else:
-                    # Create new database
-                    final_db = vector_store_manager.create_database(split_docs)
-                
-                # Save database
-                vector_store_manager.save_database(final_db)
-                
-                processing_time = (datetime.now() - start_time).total_seconds()
-                
-                responses.append(DocumentUploadResponse(
-                    filename=file.filename,
-                    status="success",
-                    message=f"Successfully processed {len(split_docs)} document chunks",
-                    document_count=len(split_docs),
-                    processing_time=processing_time
-                ))
-                
-                # Clean up temporary file
-                os.unlink(tmp_file_path)
-                
+                    # Parsing and splitting are CPU-bound, so keep them off the event loop
+                    docs = await run_in_threadpool(document_processor._process_single_file, mock_file)
+                    split_docs = await run_in_threadpool(document_processor.split_documents, docs)
+                    all_split_docs.extend(split_docs)
+                    
+                    result = DocumentUploadStruct(
+                        filename=filename,
+                        status="success",
+                        message=f"Successfully processed {len(split_docs)} document chunks",
+                        document_count=len(split_docs),
+                        processing_time=time.perf_counter() - start_time
+                    )
+                    
             except Exception as e:
-                logger.error(f"Error processing file {file.filename}: {str(e)}")
-                responses.append(DocumentUploadResponse(
-                    filename=file.filename,
+                logger.error(f"Error processing file {filename}: {str(e)}")
+                result = DocumentUploadStruct(
+                    filename=filename,
                     status="error",
                     message=str(e)
-                ))
-        
-        return responses
+                )
+            finally:
+                spool.close()
+            
+            yield _json_encoder.encode(result) + b"\n"
         
+        # Merge every file's chunks into the database and save it once
+        if all_split_docs:
+            try:
+                await run_in_threadpool(_merge_and_save, manager, all_split_docs)
+                invalidate_database_cache()
+                summary = UploadBatchStruct(
+                    status="success",
+                    message=f"Knowledge base updated with {len(all_split_docs)} document chunks",
+                    document_count=len(all_split_docs),
+                    processing_time=time.perf_counter() - start_time
+                )
+            except Exception as e:
+                logger.error(f"Error updating vector database: {str(e)}")
+                summary = UploadBatchStruct(
+                    status="error",
+                    message=f"Failed to update vector database: {str(e)}",
+                    document_count=0,
+                    processing_time=time.perf_counter() - start_time
+                )
+            yield _json_encoder.encode(summary) + b"\n"
+    
+    finally:
+        for _, spool, _ in spooled_files:
+            if spool is not None:
+                spool.close()
+
+@app.post(
+    "/upload",
+    responses={200: {
+        "content": {"application/x-ndjson": {}},
+        "description": "One DocumentUploadResponse JSON line per file, then a knowledge base update line"
+    }}
+)
+async def upload_documents(
+    files: List[UploadFile] = File(...),
+    database_type: str = "faiss",
+    token: str = Depends(verify_token)
+):
+    """Upload and process documents, streaming per-file results as NDJSON."""
+    start_time = time.perf_counter()
+    
+    try:
+        # Bind the database type to this request; other requests keep theirs
+        manager = _get_request_store_manager(database_type)
     except Exception as e:
         logger.error(f"Error in upload endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    # Spool every upload before responding: the UploadFiles are closed
+    # once this handler returns, before the stream is consumed
+    spooled_files = []
+    for file in files:
+        # Small uploads stay in memory; the spool removes any disk file itself when closed
+        spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES)
+        try:
+            await run_in_threadpool(shutil.copyfileobj, file.file, spool, 1024 * 1024)
+            spooled_files.append((file.filename, spool, None))
+        except Exception as e:
+            logger.error(f"Error receiving file {file.filename}: {str(e)}")
+            spool.close()
+            spooled_files.append((file.filename, None, str(e)))
+    
+    return StreamingResponse(
+        _upload_events(manager, spooled_files, start_time),
+        media_type="application/x-ndjson"
+    )
 
-@app.post("/chat", response_model=ChatResponse)
+# One chat engine, and so one conversation memory, per session_id. Sessions
+# idle for longer than the TTL are dropped.
+_chat_sessions = TTLCache(
+    maxsize=int(os.getenv("API_CHAT_SESSION_MAX", "1000")),
+    ttl=float(os.getenv("API_CHAT_SESSION_TTL", "3600"))
+)
+_chat_sessions_lock = threading.Lock()
+
+def _get_chat_session(session_id: str, create: bool = True) -> Optional[tuple]:
+    """
+    Get the (ChatEngine, lock) pair for a session, refreshing its TTL.
+    
+    Args:
+        session_id (str): Client-chosen conversation id
+        create (bool): Create the session if it does not exist
+        
+    Returns:
+        Optional[tuple]: (engine, lock), or None if missing and not created
+    """
+    with _chat_sessions_lock:
+        session = _chat_sessions.get(session_id)
+        if session is None:
+            if not create:
+                return None
+            session = (ChatEngine(), threading.Lock())
+        _chat_sessions[session_id] = session
+        return session
+
+def _answer_question(session_id: str, db: Any, question: str) -> tuple:
+    """
+    Answer one question with the session's chat engine.
+    
+    Requests in the same session share its memory, so they take turns;
+    different sessions run concurrently.
+    
+    Returns:
+        tuple: (answer, model name that produced it)
+    """
+    engine, lock = _get_chat_session(session_id)
+    with lock:
+        if not engine.is_ready(db):
+            engine.initialize_chain(db)
+        return engine.get_response(question), engine.model_name
+
+# Encoded with msgspec (no response_model validation pass); the
+# ChatResponse schema is kept for the OpenAPI docs only
+@app.post("/chat", responses={200: {"model": ChatResponse}})
 async def chat_with_documents(
     message: ChatMessage,
     token: str = Depends(verify_token)
 ):
     """Chat with uploaded documents."""
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
-    try:
-        # Load vector database
-        db = vector_store_manager.load_database()
-        if not db:
-            raise HTTPException(
-                status_code=404, 
-                detail="No documents found. Please upload documents first."
-            )
-        
-        # Initialize chat engine with specified provider and model
-        chat_engine.initialize_conversation_chain(
-            vectorstore=db,
-            provider=message.provider,
-            model=message.model
+    # Load vector database
+    db = await get_cached_database()
+    if not db:
+        # Expected before the first upload, so answer directly instead of raising
+        return ORJSONResponse(
+            {"error": "No documents found. Please upload documents first.", "timestamp": str(datetime.now())},
+            status_code=status.HTTP_404_NOT_FOUND
         )
-        
-        # Get response
-        response = chat_engine.get_response(
-            query=message.message,
-            session_id=message.session_id
-        )
-        
-        processing_time = (datetime.now() - start_time).total_seconds()
-        
-        return ChatResponse(
-            response=response,
-            session_id=message.session_id,
-            timestamp=datetime.now(),
-            model_used=f"{message.provider}:{message.model}",
-            processing_time=processing_time
+    
+    # Blocks on the LLM provider, so run it in the thread pool; get_response
+    # raises on provider failures, which are reported as a 502
+    try:
+        response, model_name = await run_in_threadpool(
+            _answer_question, message.session_id, db, message.message
         )
-        
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error generating chat response: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Error generating response: {str(e)}"
+        )
+    
+    processing_time = time.perf_counter() - start_time
+    
+    return msgspec_response(ChatResponseStruct(
+        response=response,
+        session_id=message.session_id,
+        timestamp=datetime.now(),
+        model_used=f"openai:{model_name}",
+        processing_time=processing_time
+    ))
 
 @app.get("/conversations/{session_id}")
 async def get_conversation_history(
@@ -388,7 +644,9 @@ async def get_conversation_history(
 ):
     """Get conversation history for a session."""
     try:
-        history = chat_engine.get_conversation_history(session_id)
+        session = _get_chat_session(session_id, create=False)
+        messages = session[0].get_chat_history() if session else []
+        history = [{"role": msg.type, "content": msg.content} for msg in messages]
         return {"session_id": session_id, "history": history}
     except Exception as e:
         logger.error(f"Error getting conversation history: {str(e)}")
@@ -401,7 +659,8 @@ async def clear_conversation(
 ):
     """Clear conversation history for a session."""
     try:
-        chat_engine.clear_conversation_memory(session_id)
+        with _chat_sessions_lock:
+            _chat_sessions.pop(session_id, None)
         return {"message": f"Conversation {session_id} cleared successfully"}
     except Exception as e:
         logger.error(f"Error clearing conversation: {str(e)}")
@@ -415,22 +674,61 @@ async def configure_database(
     """Configure vector database type."""
     try:
         vector_store_manager.set_database_type(config.database_type)
+        invalidate_database_cache()
         return {"message": f"Database type set to {config.database_type}"}
     except Exception as e:
         logger.error(f"Error configuring database: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Provider status is refreshed in the background instead of per request
+PROVIDERS = ("openai", "anthropic", "google", "local")
+PROVIDERS_REFRESH_SECONDS = int(os.getenv("API_PROVIDERS_REFRESH_SECONDS", "60"))
+app.state.providers_status = {}
+
+def _compute_providers_status() -> Dict[str, Any]:
+    """Validate every provider's setup."""
+    return {provider: multi_model_manager.validate_provider_setup(provider) for provider in PROVIDERS}
+
+async def refresh_providers_status() -> Dict[str, Any]:
+    """Recompute the cached provider status off the event loop."""
+    app.state.providers_status = await run_in_threadpool(_compute_providers_status)
+    return app.state.providers_status
+
+async def _refresh_providers_periodically() -> None:
+    """Keep the provider status cache fresh."""
+    while True:
+        try:
+            await refresh_providers_status()
+        except Exception as e:
+            logger.error(f"Error refreshing providers: {str(e)}")
+        await asyncio.sleep(PROVIDERS_REFRESH_SECONDS)
+
+@app.on_event("startup")
+async def start_providers_refresh() -> None:
+    """Start the background provider status refresh."""
+    app.state.providers_refresh_task = asyncio.create_task(_refresh_providers_periodically())
+
+@app.on_event("shutdown")
+async def stop_providers_refresh() -> None:
+    """Stop the background provider status refresh."""
+    task = getattr(app.state, "providers_refresh_task", None)
+    if task is not None:
+        task.cancel()
+
 @app.get("/providers")
 async def get_available_providers(token: str = Depends(verify_token)):
     """Get available model providers and their status."""
+    if not app.state.providers_status:
+        return await refresh_providers_status()
+    return app.state.providers_status
+
+@app.post("/providers/refresh")
+async def refresh_providers(token: str = Depends(verify_token)):
+    """Re-check provider setup now, e.g. after changing credentials."""
     try:
-        providers_status = {}
-        for provider in ["openai", "anthropic", "google", "local"]:
-            providers_status[provider] = multi_model_manager.validate_provider_setup(provider)
-        
-        return providers_status
+        return await refresh_providers_status()
     except Exception as e:
-        logger.error(f"Error getting providers: {str(e)}")
+        logger.error(f"Error refreshing providers: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/models/{provider}")
@@ -440,8 +738,8 @@ async def get_provider_models(
 ):
     """Get available models for a specific provider."""
     try:
-        chat_models = config_manager.get_available_models(provider)
-        embedding_models = config_manager.get_available_embedding_models(provider)
+        chat_models = dict(config_manager.get_available_models(provider))
+        embedding_models = dict(config_manager.get_available_embedding_models(provider))
         
         return {
             "provider": provider,
@@ -457,7 +755,7 @@ async def clear_all_documents(token: str = Depends(verify_token)):
     """Clear all documents from the vector database."""
     try:
         # Delete vector databases
-        paths = config_manager.get_vector_db_paths()
+        paths = config_manager.get_vector_db_paths(vector_store_manager.embedding_backend)
         
         success_messages = []
         if vector_store_manager.current_store:
@@ -465,6 +763,7 @@ async def clear_all_documents(token: str = Depends(verify_token)):
                 success_messages.append("FAISS database cleared")
             if vector_store_manager.current_store.delete(paths["chroma_dir"]):
                 success_messages.append("ChromaDB database cleared")
+        invalidate_database_cache()
         
         return {"message": "Documents cleared", "details": success_messages}
     except Exception as e:
@@ -475,7 +774,7 @@ async def clear_all_documents(token: str = Depends(verify_token)):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail, "timestamp": str(datetime.now())}
     )
@@ -484,20 +783,35 @@ async def http_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """Handle general exceptions."""
     logger.error(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"error": "Internal server error", "timestamp": str(datetime.now())}
     )
 
-# Run the API server
-if __name__ == "__main__":
+def serve() -> None:
+    """
+    Run the API server with uvicorn.
+    
+    Uses uvloop and httptools when installed. Auto-reload and multiple
+    workers need an import string, so the app object is passed directly
+    only for the default single-process, no-reload production path.
+    """
     port = int(os.getenv("API_PORT", 8000))
     host = os.getenv("API_HOST", "0.0.0.0")
+    reload = os.getenv("API_RELOAD", "0") == "1"
+    workers = int(os.getenv("API_WORKERS", "1"))
     
     uvicorn.run(
-        "api:app",
+        "Modular_App.api:app" if reload or workers > 1 else app,
         host=host,
         port=port,
-        reload=True,
+        loop="auto",  # uvloop when installed
+        http="auto",  # httptools when installed
+        reload=reload,
+        workers=None if reload else workers,
         log_level="info"
-    )
\ No newline at end of file
+    )
+
+# Run the API server
+if __name__ == "__main__":
+    serve()
@@ -1,6 +1,8 @@
 """
 Authentication module for the GenAI Chatbot application.
 """
+import hashlib
+import hmac
 import streamlit as st
 from Modular_App.config import config_manager
 
@@ -10,6 +12,7 @@ class AuthManager:
     
     def __init__(self):
         self.config = config_manager.app_config
+        self.config_manager = config_manager
     
     def authenticate(self) -> bool:
         """
@@ -48,7 +51,10 @@ class AuthManager:
     
     def _validate_credentials(self, username: str, password: str) -> bool:
         """
-        Validate user credentials.
+        Validate user credentials against APP_USER / APP_PW_HASH.
+        
+        Both comparisons use hmac.compare_digest and are always evaluated,
+        so timing does not reveal which field was wrong.
         
         Args:
             username (str): Username to validate
@@ -57,13 +63,16 @@ class AuthManager:
         Returns:
             bool: True if credentials are valid
         """
-        return (
-            username == self.config.DEFAULT_USERNAME and 
-            password == self.config.DEFAULT_PASSWORD
-        )
+        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        user_ok = hmac.compare_digest(username.encode(), self.config_manager.get_app_user().encode())
+        password_ok = hmac.compare_digest(password_hash, self.config_manager.get_app_password_hash())
+        return user_ok and password_ok
     
     def show_login_info(self) -> None:
-        """Display login information for users."""
+        """Display login information for users (demo credentials only)."""
+        if self.config_manager.has_custom_credentials():
+            return
+        
         with st.sidebar.expander("ℹ️ Login Info"):
             st.write(f"**Username:** {self.config.DEFAULT_USERNAME}")
             st.write(f"**Password:** {self.config.DEFAULT_PASSWORD}")
@@ -91,6 +100,10 @@ class AuthManager:
         Returns:
             bool: True if authenticated, False if authentication required
         """
+        # Skip the login widgets on reruns once this session has logged in
+        if self.is_authenticated():
+            return True
+        
         if not self.authenticate():
             self.show_login_info()
             st.warning("🔒 Please login to access the application")
@@ -1,14 +1,46 @@
 """
 Chat engine module for handling conversational AI interactions.
 """
-from typing import Any, Optional
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Any, List, Optional
+import orjson
 import streamlit as st
+from langchain.callbacks.base import BaseCallbackHandler
 from langchain.chains import ConversationalRetrievalChain
-from langchain.chat_models import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
 from langchain.prompts import PromptTemplate
 
 from .config import config_manager
+from .multi_model_provider import ChatOpenAI, get_openai_client_kwargs
+
+
+@st.cache_resource(show_spinner=False)
+def _get_chat_model(api_key: str, model_name: str, temperature: float, max_tokens: int,
+                    streaming: bool = False) -> ChatOpenAI:
+    """Create the chat model client once per configuration and share it across reruns."""
+    return ChatOpenAI(
+        openai_api_key=api_key,
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        streaming=streaming,
+        **get_openai_client_kwargs()
+    )
+
+
+class StreamlitTokenHandler(BaseCallbackHandler):
+    """Render streamed LLM tokens into a Streamlit placeholder as they arrive."""
+    
+    def __init__(self, placeholder: Any):
+        self.placeholder = placeholder
+        self.text = ""
+    
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Append a token and redraw the partial answer."""
+        self.text += token
+        self.placeholder.markdown(self.text + "▌")
 
 
 class ChatEngine:
@@ -18,66 +50,77 @@ class ChatEngine:
         self.config = config_manager
         self.chain: Optional[ConversationalRetrievalChain] = None
         self.memory: Optional[ConversationBufferMemory] = None
+        self.vector_db: Any = None
+        self.model_name: Optional[str] = None
+        
+        # Create custom prompt template once; it only depends on static config
+        self.prompt = PromptTemplate(
+            input_variables=["context", "question"],
+            template=self.config.chat_config.SYSTEM_PROMPT
+        )
     
     def initialize_chain(self, vector_db: Any) -> None:
         """
         Initialize the conversational retrieval chain.
         
+        Existing conversation memory is kept, so rebinding the chain to a new
+        database does not lose the chat history.
+        
         Args:
             vector_db: Vector database instance (FAISS or Chroma)
         """
-        # Initialize memory
-        self.memory = ConversationBufferMemory(
-            memory_key=self.config.chat_config.MEMORY_KEY,
-            return_messages=self.config.chat_config.RETURN_MESSAGES
-        )
+        # Initialize memory once per engine
+        if self.memory is None:
+            self.memory = ConversationBufferMemory(
+                memory_key=self.config.chat_config.MEMORY_KEY,
+                return_messages=self.config.chat_config.RETURN_MESSAGES
+            )
         
-        # Create custom prompt template
-        custom_prompt = PromptTemplate(
-            input_variables=["context", "question"],
-            template=self.config.chat_config.SYSTEM_PROMPT
+        # Initialize ChatOpenAI (client is shared; memory stays per session)
+        model_args = (
+            self.config.get_openai_api_key(),
+            self.config.get_openai_model(),
+            self.config.chat_config.TEMPERATURE,
+            self.config.chat_config.MAX_TOKENS
         )
+        llm = _get_chat_model(*model_args, streaming=self.config.chat_config.STREAMING)
         
-        # Initialize ChatOpenAI
-        llm = ChatOpenAI(
-            openai_api_key=self.config.get_openai_api_key(),
-            model_name=self.config.get_openai_model(),
-            temperature=self.config.chat_config.TEMPERATURE,
-            max_tokens=self.config.chat_config.MAX_TOKENS
-        )
+        # Question condensing uses a non-streaming model so its tokens never reach the UI
+        condense_llm = _get_chat_model(*model_args, streaming=False)
         
         # Create conversational retrieval chain
         self.chain = ConversationalRetrievalChain.from_llm(
             llm=llm,
+            condense_question_llm=condense_llm,
             retriever=vector_db.as_retriever(),
             memory=self.memory,
-            combine_docs_chain_kwargs={"prompt": custom_prompt},
+            combine_docs_chain_kwargs={"prompt": self.prompt},
             verbose=False  # Set to True for debugging
         )
+        self.vector_db = vector_db
+        self.model_name = model_args[1]
     
-    def get_response(self, question: str) -> str:
+    def get_response(self, question: str, callbacks: Optional[List[BaseCallbackHandler]] = None) -> str:
         """
         Get AI response for a question.
         
         Args:
             question (str): User's question
+            callbacks (Optional[List[BaseCallbackHandler]]): Run-time callbacks,
+                e.g. a StreamlitTokenHandler to render the answer as it streams
             
         Returns:
             str: AI generated response
             
         Raises:
             ValueError: If chain is not initialized
+            Exception: Errors from the LLM provider are passed on to the caller
         """
         if not self.chain:
             raise ValueError("Chat engine not initialized. Call initialize_chain() first.")
         
-        try:
-            response = self.chain.run(question)
-            return response.strip()
-        
-        except Exception as e:
-            st.error(f"Error generating response: {str(e)}")
-            return "I apologize, but I encountered an error while processing your question. Please try again."
+        response = self.chain.run(question, callbacks=callbacks)
+        return response.strip()
     
     def get_chat_history(self) -> list:
         """
@@ -107,23 +150,29 @@ class ChatEngine:
             dict: Memory statistics
         """
         history = self.get_chat_history()
+        type_counts = Counter(getattr(msg, 'type', None) for msg in history)
         
         return {
             "total_messages": len(history),
-            "user_messages": len([msg for msg in history if hasattr(msg, 'type') and msg.type == 'human']),
-            "ai_messages": len([msg for msg in history if hasattr(msg, 'type') and msg.type == 'ai']),
+            "user_messages": type_counts['human'],
+            "ai_messages": type_counts['ai'],
             "memory_initialized": self.memory is not None,
             "chain_initialized": self.chain is not None
         }
     
-    def is_ready(self) -> bool:
+    def is_ready(self, vector_db: Any = None) -> bool:
         """
         Check if chat engine is ready to handle questions.
         
+        Args:
+            vector_db: If given, also require the chain to be bound to this database
+        
         Returns:
             bool: True if engine is ready
         """
-        return self.chain is not None and self.memory is not None
+        if self.chain is None or self.memory is None:
+            return False
+        return vector_db is None or self.vector_db is vector_db
 
 
 class ConversationManager:
@@ -183,25 +232,28 @@ class ConversationManager:
             dict: Conversation statistics
         """
         messages = ConversationManager.get_messages()
+        role_counts = Counter(msg.get("role") for msg in messages)
         
         return {
             "total_messages": len(messages),
-            "user_messages": len([msg for msg in messages if msg.get("role") == "user"]),
-            "assistant_messages": len([msg for msg in messages if msg.get("role") == "assistant"]),
+            "user_messages": role_counts["user"],
+            "assistant_messages": role_counts["assistant"],
             "has_conversation": len(messages) > 0
         }
     
     @staticmethod
     def display_chat_history() -> None:
-        """Display chat history in Streamlit interface."""
+        """
+        Display chat history in Streamlit interface.
+        
+        Consecutive messages from the same role share one chat bubble, so
+        fewer Streamlit elements are created on every rerun.
+        """
         messages = ConversationManager.get_messages()
         
-        for message in messages:
-            role = message.get("role", "user")
-            content = message.get("content", "")
-            
+        for role, group in groupby(messages, key=lambda message: message.get("role", "user")):
             with st.chat_message(role):
-                st.write(content)
+                st.write("\n\n".join(message.get("content", "") for message in group))
     
     @staticmethod
     def export_conversation() -> str:
@@ -216,14 +268,29 @@ class ConversationManager:
         if not messages:
             return "No conversation to export."
         
-        exported_text = "# Conversation Export\n\n"
+        # Join once instead of growing the string message by message
+        sections = (
+            f"## {i}. {message.get('role', 'user').title()}\n{message.get('content', '')}\n\n"
+            for i, message in enumerate(messages, 1)
+        )
+        return "# Conversation Export\n\n" + "".join(sections)
+    
+    @staticmethod
+    def export_conversation_bytes() -> bytes:
+        """
+        Export conversation as JSON, encoded straight to bytes with orjson.
         
-        for i, message in enumerate(messages, 1):
-            role = message.get("role", "user").title()
-            content = message.get("content", "")
-            exported_text += f"## {i}. {role}\n{content}\n\n"
+        Returns:
+            bytes: UTF-8 JSON with the export time and the messages
+        """
+        messages = ConversationManager.get_messages()
         
-        return exported_text
+        # orjson formats the datetime natively, no isoformat() round trip
+        return orjson.dumps({
+            "exported_at": datetime.now(timezone.utc),
+            "total_messages": len(messages),
+            "messages": messages
+        })
 
 # Global instances
 chat_engine = ChatEngine()
@@ -1,9 +1,74 @@
 """
 Configuration settings for the GenAI Chatbot application.
 """
+import hashlib
 import os
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Tuple
+
+
+# Read-only defaults shared by every config instance (built once per process)
+_ALLOWED_FILE_TYPES = ("pdf", "docx", "xlsx", "pptx", "txt")
+
+_TEXT_SEPARATORS = ("\n\n", "\n", " ", "")
+
+_SUPPORTED_LANGUAGES = MappingProxyType({
+    "en": "English",
+    "es": "Español", 
+    "fr": "Français",
+    "de": "Deutsch",
+    "it": "Italiano",
+    "pt": "Português",
+    "ru": "Русский",
+    "zh": "中文",
+    "ja": "日本語",
+    "ko": "한국어",
+    "ar": "العربية",
+    "hi": "हिन्दी"
+})
+
+_OPENAI_MODELS = MappingProxyType({
+    "gpt-3.5-turbo": "GPT-3.5 Turbo (Fast)",
+    "gpt-4": "GPT-4 (Advanced)",
+    "gpt-4-turbo": "GPT-4 Turbo (Latest)"
+})
+
+_OPENAI_EMBEDDING_MODELS = MappingProxyType({
+    "text-embedding-ada-002": "Ada-002 (Standard)",
+    "text-embedding-3-small": "Embedding v3 Small", 
+    "text-embedding-3-large": "Embedding v3 Large"
+})
+
+_ANTHROPIC_MODELS = MappingProxyType({
+    "claude-3-haiku": "Claude 3 Haiku (Fast)",
+    "claude-3-sonnet": "Claude 3 Sonnet (Balanced)",
+    "claude-3-opus": "Claude 3 Opus (Advanced)"
+})
+
+_GOOGLE_MODELS = MappingProxyType({
+    "gemini-pro": "Gemini Pro",
+    "gemini-pro-vision": "Gemini Pro Vision"
+})
+
+_LOCAL_MODELS = MappingProxyType({
+    "llama2": "Llama 2",
+    "mistral": "Mistral 7B",
+    "codellama": "Code Llama"
+})
+
+_EMBEDDING_BACKENDS = MappingProxyType({
+    "openai": "OpenAI",
+    "local": "Local (ONNX int8)"
+})
+
+_LOCAL_EMBEDDING_MODELS = MappingProxyType({"multilingual": "Multilingual (Local)"})
+
+_PROVIDER_NAMES = MappingProxyType({
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "google": "Google"
+})
 
 
 @dataclass
@@ -19,16 +84,22 @@ class AppConfig:
     DEFAULT_PASSWORD: str = "password123"
     
     # File settings
-    ALLOWED_FILE_TYPES: list = None
+    ALLOWED_FILE_TYPES: Tuple[str, ...] = _ALLOWED_FILE_TYPES
     MAX_FILE_SIZE_MB: int = 100
+    MAX_PARSE_WORKERS: int = 8
+    PARALLEL_PARSING: bool = True
+    PARSE_IN_PROCESSES: bool = False  # Parse XLSX/PPTX (pure-Python Unstructured) in worker processes
     
     # Text processing
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    TEXT_SEPARATORS: Tuple[str, ...] = _TEXT_SEPARATORS
+    TEXT_SPLITTER: str = "recursive"  # recursive (LangChain) or semchunk (faster, needs semchunk installed)
     
     # Vector database settings
     VECTOR_DB_DIR: str = "vector_db"
     FAISS_INDEX_NAME: str = "faiss_index"
+    CONTENT_HASHES_FILE: str = "hashes.pkl"
     CHROMA_COLLECTION_NAME: str = "pdf_documents"
     
     # Model Provider settings
@@ -38,32 +109,11 @@ class AppConfig:
     
     # Multi-language settings
     DEFAULT_LANGUAGE: str = "en"  # English
-    SUPPORTED_LANGUAGES: Dict[str, str] = None
+    SUPPORTED_LANGUAGES: Mapping[str, str] = field(default_factory=lambda: _SUPPORTED_LANGUAGES)
     AUTO_DETECT_LANGUAGE: bool = True
     
     # UI settings
     SIDEBAR_WIDTH: int = 300
-    
-    def __post_init__(self):
-        """Initialize mutable defaults."""
-        if self.ALLOWED_FILE_TYPES is None:
-            self.ALLOWED_FILE_TYPES = ["pdf", "docx", "xlsx", "pptx", "txt"]
-            
-        if self.SUPPORTED_LANGUAGES is None:
-            self.SUPPORTED_LANGUAGES = {
-                "en": "English",
-                "es": "Español", 
-                "fr": "Français",
-                "de": "Deutsch",
-                "it": "Italiano",
-                "pt": "Português",
-                "ru": "Русский",
-                "zh": "中文",
-                "ja": "日本語",
-                "ko": "한국어",
-                "ar": "العربية",
-                "hi": "हिन्दी"
-            }
 
 
 @dataclass
@@ -73,6 +123,20 @@ class VectorStoreConfig:
     # FAISS settings
     FAISS_SIMILARITY_THRESHOLD: float = 0.7
     FAISS_K_DOCUMENTS: int = 5
+    FAISS_INDEX_TYPE: str = "hnsw"  # hnsw (approximate, sublinear) or flat (exact)
+    FAISS_HNSW_M: int = 32
+    FAISS_HNSW_EF_CONSTRUCTION: int = 200
+    FAISS_HNSW_EF_SEARCH: int = 64
+    FAISS_VECTOR_ENCODING: str = "fp16"  # fp32, fp16 (half the memory) or pq (IVF-PQ, ~24x smaller)
+    FAISS_IVF_NLIST: int = 256
+    FAISS_IVF_NPROBE: int = 16
+    FAISS_PQ_M: int = 64
+    FAISS_PQ_NBITS: int = 8
+    
+    # Embedding settings (2048 is the OpenAI per-request input limit)
+    EMBEDDING_BATCH_SIZE: int = 2048
+    EMBEDDING_MAX_RETRIES: int = 6
+    MAX_CONCURRENT_EMBEDDING_BATCHES: int = 4
     
     # ChromaDB settings
     CHROMA_DISTANCE_FUNCTION: str = "cosine"
@@ -85,53 +149,29 @@ class ModelProviderConfig:
     """Multi-model provider configurations."""
     
     # OpenAI
-    OPENAI_MODELS: Dict[str, str] = None
-    OPENAI_EMBEDDING_MODELS: Dict[str, str] = None
+    OPENAI_MODELS: Mapping[str, str] = field(default_factory=lambda: _OPENAI_MODELS)
+    OPENAI_EMBEDDING_MODELS: Mapping[str, str] = field(default_factory=lambda: _OPENAI_EMBEDDING_MODELS)
+    
+    # Shared HTTP client for OpenAI chat and embedding calls
+    HTTP_MAX_CONNECTIONS: int = 40
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_TIMEOUT_SECONDS: float = 60.0
+    HTTP_CONNECT_RETRIES: int = 3
     
     # Anthropic
-    ANTHROPIC_MODELS: Dict[str, str] = None
+    ANTHROPIC_MODELS: Mapping[str, str] = field(default_factory=lambda: _ANTHROPIC_MODELS)
     
     # Google
-    GOOGLE_MODELS: Dict[str, str] = None
+    GOOGLE_MODELS: Mapping[str, str] = field(default_factory=lambda: _GOOGLE_MODELS)
     
     # Local models (Ollama, etc.)
-    LOCAL_MODELS: Dict[str, str] = None
-    
-    def __post_init__(self):
-        """Initialize model configurations."""
-        if self.OPENAI_MODELS is None:
-            self.OPENAI_MODELS = {
-                "gpt-3.5-turbo": "GPT-3.5 Turbo (Fast)",
-                "gpt-4": "GPT-4 (Advanced)",
-                "gpt-4-turbo": "GPT-4 Turbo (Latest)"
-            }
-            
-        if self.OPENAI_EMBEDDING_MODELS is None:
-            self.OPENAI_EMBEDDING_MODELS = {
-                "text-embedding-ada-002": "Ada-002 (Standard)",
-                "text-embedding-3-small": "Embedding v3 Small", 
-                "text-embedding-3-large": "Embedding v3 Large"
-            }
-            
-        if self.ANTHROPIC_MODELS is None:
-            self.ANTHROPIC_MODELS = {
-                "claude-3-haiku": "Claude 3 Haiku (Fast)",
-                "claude-3-sonnet": "Claude 3 Sonnet (Balanced)",
-                "claude-3-opus": "Claude 3 Opus (Advanced)"
-            }
-            
-        if self.GOOGLE_MODELS is None:
-            self.GOOGLE_MODELS = {
-                "gemini-pro": "Gemini Pro",
-                "gemini-pro-vision": "Gemini Pro Vision"
-            }
-            
-        if self.LOCAL_MODELS is None:
-            self.LOCAL_MODELS = {
-                "llama2": "Llama 2",
-                "mistral": "Mistral 7B",
-                "codellama": "Code Llama"
-            }
+    LOCAL_MODELS: Mapping[str, str] = field(default_factory=lambda: _LOCAL_MODELS)
+    
+    # Embedding backends
+    EMBEDDING_BACKENDS: Mapping[str, str] = field(default_factory=lambda: _EMBEDDING_BACKENDS)
+    LOCAL_EMBEDDING_MODEL: str = "intfloat/e5-small-v2"
+    LOCAL_EMBEDDING_FILE: str = "model_quantized.onnx"
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 64
 
 
 @dataclass
@@ -160,6 +200,7 @@ class ChatConfig:
     # Response settings
     MAX_TOKENS: int = 1000
     TEMPERATURE: float = 0.1
+    STREAMING: bool = True  # Render answers token by token
     
     # System prompt
     SYSTEM_PROMPT: str = """
@@ -184,18 +225,52 @@ class ConfigManager:
         self.chat_config = ChatConfig()
         self.model_config = ModelProviderConfig()
         self.language_config = LanguageConfig()
+        self.refresh()
+    
+    def refresh(self) -> None:
+        """Re-read environment variables (values are cached after the first read)."""
+        self._openai_api_key = os.getenv("OPENAI_API_KEY", "")
+        self._openai_model = os.getenv("OPENAI_MODEL", self.app_config.DEFAULT_MODEL)
+        self._embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", self.app_config.DEFAULT_EMBEDDING_MODEL)
+        self._current_language = os.getenv("APP_LANGUAGE", self.app_config.DEFAULT_LANGUAGE)
+        self._app_user = os.getenv("APP_USER", self.app_config.DEFAULT_USERNAME)
+        
+        password_hash = os.getenv("APP_PW_HASH")
+        self._has_custom_credentials = bool(password_hash)
+        if password_hash:
+            self._app_password_hash = password_hash.lower()
+        else:
+            self._app_password_hash = hashlib.sha256(self.app_config.DEFAULT_PASSWORD.encode()).hexdigest()
+        
+        self._provider_keys = {
+            "openai": os.getenv("OPENAI_API_KEY"),
+            "anthropic": os.getenv("ANTHROPIC_API_KEY"),
+            "google": os.getenv("GOOGLE_API_KEY")
+        }
     
     def get_openai_api_key(self) -> str:
         """Get OpenAI API key from environment."""
-        return os.getenv("OPENAI_API_KEY", "")
+        return self._openai_api_key
     
     def get_openai_model(self) -> str:
         """Get OpenAI model from environment or default."""
-        return os.getenv("OPENAI_MODEL", self.app_config.DEFAULT_MODEL)
+        return self._openai_model
     
     def get_embedding_model(self) -> str:
         """Get embedding model from environment or default."""
-        return os.getenv("OPENAI_EMBEDDING_MODEL", self.app_config.DEFAULT_EMBEDDING_MODEL)
+        return self._embedding_model
+    
+    def get_app_user(self) -> str:
+        """Get login username from environment or default."""
+        return self._app_user
+    
+    def get_app_password_hash(self) -> str:
+        """Get SHA-256 hex digest of the login password from environment or default."""
+        return self._app_password_hash
+    
+    def has_custom_credentials(self) -> bool:
+        """Check whether login credentials are configured in the environment."""
+        return self._has_custom_credentials
     
     def validate_environment(self) -> tuple[bool, str]:
         """Validate required environment variables."""
@@ -204,15 +279,27 @@ class ConfigManager:
             return False, "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file"
         return True, ""
     
-    def get_vector_db_paths(self) -> Dict[str, str]:
-        """Get vector database paths."""
+    def get_vector_db_paths(self, embedding_backend: str = "openai") -> Dict[str, str]:
+        """
+        Get vector database paths for an embedding backend.
+        
+        Backends embed into different dimensions, so each keeps its own
+        stores; OpenAI keeps the original paths.
+        
+        Args:
+            embedding_backend (str): Embedding backend key ('openai' or 'local')
+            
+        Returns:
+            Dict[str, str]: FAISS directory/index path and Chroma directory
+        """
+        suffix = "" if embedding_backend == "openai" else f"_{embedding_backend}"
         return {
             "faiss_dir": self.app_config.VECTOR_DB_DIR,
-            "faiss_path": os.path.join(self.app_config.VECTOR_DB_DIR, self.app_config.FAISS_INDEX_NAME),
-            "chroma_dir": self.vector_config.CHROMA_PERSIST_DIR
+            "faiss_path": os.path.join(self.app_config.VECTOR_DB_DIR, self.app_config.FAISS_INDEX_NAME + suffix),
+            "chroma_dir": self.vector_config.CHROMA_PERSIST_DIR + suffix
         }
     
-    def get_available_models(self, provider: str) -> Dict[str, str]:
+    def get_available_models(self, provider: str) -> Mapping[str, str]:
         """Get available models for a specific provider."""
         provider = provider.lower()
         if provider == "openai":
@@ -223,44 +310,29 @@ class ConfigManager:
             return self.model_config.GOOGLE_MODELS
         elif provider == "local":
             return self.model_config.LOCAL_MODELS
-        return {}
+        return MappingProxyType({})
     
-    def get_available_embedding_models(self, provider: str = "openai") -> Dict[str, str]:
+    def get_available_embedding_models(self, provider: str = "openai") -> Mapping[str, str]:
         """Get available embedding models for a provider."""
         if provider.lower() == "openai":
             return self.model_config.OPENAI_EMBEDDING_MODELS
-        return {"multilingual": "Multilingual (Local)"}
+        return _LOCAL_EMBEDDING_MODELS
     
-    def get_supported_languages(self) -> Dict[str, str]:
+    def get_supported_languages(self) -> Mapping[str, str]:
         """Get supported languages."""
         return self.app_config.SUPPORTED_LANGUAGES
     
     def get_current_language(self) -> str:
         """Get current language setting."""
-        return os.getenv("APP_LANGUAGE", self.app_config.DEFAULT_LANGUAGE)
+        return self._current_language
     
     def validate_provider_credentials(self, provider: str) -> tuple[bool, str]:
         """Validate credentials for a specific provider."""
         provider = provider.lower()
         
-        if provider == "openai":
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                return False, "OpenAI API key not found"
-                
-        elif provider == "anthropic":
-            api_key = os.getenv("ANTHROPIC_API_KEY")
-            if not api_key:
-                return False, "Anthropic API key not found"
-                
-        elif provider == "google":
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                return False, "Google API key not found"
-                
-        elif provider == "local":
-            # Local models don't need API keys
-            pass
+        # Local models don't need API keys
+        if provider in self._provider_keys and not self._provider_keys[provider]:
+            return False, f"{_PROVIDER_NAMES[provider]} API key not found"
             
         return True, ""
 
@@ -2,44 +2,260 @@
 Document processing module for multi-format document handling and text extraction.
 Supports PDF, Word (DOCX), Excel (XLSX), PowerPoint (PPTX), and Text files.
 """
+import hashlib
+import io
 import tempfile
 import os
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 import streamlit as st
 from pathlib import Path
 
 # Document loaders for different formats
 from langchain.document_loaders import (
-    PyPDFLoader,
     Docx2txtLoader, 
     UnstructuredExcelLoader,
-    UnstructuredPowerPointLoader,
-    TextLoader
+    UnstructuredPowerPointLoader
 )
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from pypdf import PdfReader
+
+# BLAKE3 is optional - SIMD file hashing, falls back to SHA-256
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# PyMuPDF is optional - C-backed PDF parsing, falls back to pypdf
+try:
+    import fitz
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+# docx2txt is optional here - lets DOCX parse from memory, falls back to Docx2txtLoader
+try:
+    import docx2txt
+    DOCX2TXT_AVAILABLE = True
+except ImportError:
+    DOCX2TXT_AVAILABLE = False
+
+# semchunk is optional - faster recursive splitting, falls back to LangChain
+try:
+    import semchunk
+    SEMCHUNK_AVAILABLE = True
+except ImportError:
+    SEMCHUNK_AVAILABLE = False
 
 from .config import config_manager
 
 
+def compute_file_digest(file_bytes: bytes) -> bytes:
+    """
+    Digest raw file content for use as a cache key.
+    
+    Uses BLAKE3 when installed; otherwise SHA-256, which hashlib accelerates
+    with SHA extensions where the CPU has them.
+    
+    Args:
+        file_bytes (bytes): Raw file content
+        
+    Returns:
+        bytes: Binary digest of the content
+    """
+    if BLAKE3_AVAILABLE:
+        return blake3(file_bytes).digest()
+    return hashlib.sha256(file_bytes).digest()
+
+
+def compute_content_hash(text: str) -> str:
+    """
+    Fingerprint chunk text so identical chunks can be skipped before embedding.
+    
+    Args:
+        text (str): Chunk content
+        
+    Returns:
+        str: 128-bit BLAKE2b hex digest
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compute_upload_digest(uploaded_file, file_bytes: Optional[bytes] = None) -> bytes:
+    """
+    Digest an uploaded file's content, hashing each Streamlit upload only once.
+    
+    Streamlit uploads carry a ``file_id`` that changes whenever the file is
+    re-uploaded, so the digest is memoized on it; other file objects (such as
+    the API's spooled uploads) are hashed directly.
+    
+    Args:
+        uploaded_file: Streamlit uploaded file object
+        file_bytes (Optional[bytes]): Content already read from the file, if any
+        
+    Returns:
+        bytes: Binary digest of the content (see compute_file_digest)
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is None:
+        return compute_file_digest(uploaded_file.getvalue() if file_bytes is None else file_bytes)
+    return _upload_digest_cached(file_id, uploaded_file)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _upload_digest_cached(file_id: str, _uploaded_file) -> bytes:
+    """Digest an upload, cached on its Streamlit file_id."""
+    return compute_file_digest(_uploaded_file.getvalue())
+
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def _parse_file_cached(file_digest: bytes, file_extension: str, _file_bytes: bytes) -> List[Document]:
+    """
+    Parse raw file bytes into documents, cached on the content hash.
+    
+    Streamlit reruns the whole script on every interaction, so re-parsing the
+    same upload is avoided by keying the cache on ``file_digest`` only (the
+    underscore-prefixed bytes argument is excluded from Streamlit's hashing).
+    
+    Args:
+        file_digest (bytes): Digest of the file content (see compute_file_digest)
+        file_extension (str): Lower-cased file extension including the dot
+        _file_bytes (bytes): Raw file content
+        
+    Returns:
+        List[Document]: Documents extracted by the format's loader
+    """
+    if file_extension in _PROCESS_POOL_FORMATS and config_manager.app_config.PARSE_IN_PROCESSES:
+        # Unstructured parsing holds the GIL, so threads alone cannot overlap it
+        return _get_parse_process_pool().submit(_parse_file_bytes, file_extension, _file_bytes).result()
+    return _parse_file_bytes(file_extension, _file_bytes)
+
+
+# RAM-backed temp directory (Linux) for small files; it is often only 64MB in containers
+_SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+_SHM_MAX_BYTES = 4 * 1024 * 1024
+
+# Formats whose loaders are pure-Python and CPU-bound
+_PROCESS_POOL_FORMATS = frozenset({'.xlsx', '.pptx'})
+
+
+@lru_cache(maxsize=None)
+def _get_parse_process_pool() -> ProcessPoolExecutor:
+    """Get the process pool shared by all parse threads (created on first use)."""
+    return ProcessPoolExecutor(max_workers=config_manager.app_config.MAX_PARSE_WORKERS)
+
+
+def _parse_file_bytes(file_extension: str, file_bytes: bytes) -> List[Document]:
+    """
+    Parse raw file bytes with the parser registered for the format.
+    
+    Kept at module level so it can be sent to a worker process.
+    
+    Args:
+        file_extension (str): Lower-cased file extension including the dot
+        file_bytes (bytes): Raw file content
+        
+    Returns:
+        List[Document]: Documents extracted by the format's parser
+    """
+    return DocumentProcessor.SUPPORTED_FORMATS[file_extension]['parser'](file_bytes)
+
+
+def _load_from_temp_file(loader_class, file_extension: str, file_bytes: bytes) -> List[Document]:
+    """
+    Run a path-based LangChain loader over bytes written to a temporary file.
+    
+    The file goes to RAM-backed /dev/shm when it is small enough.
+    
+    Args:
+        loader_class: Loader class taking a file path
+        file_extension (str): Suffix for the temporary file
+        file_bytes (bytes): Raw file content
+        
+    Returns:
+        List[Document]: Documents extracted by the loader
+    """
+    tmp_dir = _SHM_DIR if len(file_bytes) <= _SHM_MAX_BYTES else None
+    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension, dir=tmp_dir) as tmp_file:
+        tmp_file.write(file_bytes)
+        tmp_file_path = tmp_file.name
+    
+    try:
+        return loader_class(tmp_file_path).load()
+        
+    finally:
+        # Clean up temporary file
+        if os.path.exists(tmp_file_path):
+            os.remove(tmp_file_path)
+
+
+def _parse_pdf_bytes(file_bytes: bytes) -> List[Document]:
+    """
+    Extract one document per page straight from memory, without a temp file.
+    
+    Uses PyMuPDF when installed and pypdf otherwise.
+    
+    Args:
+        file_bytes (bytes): Raw PDF content
+        
+    Returns:
+        List[Document]: One document per page, with a zero-based ``page``
+    """
+    if PYMUPDF_AVAILABLE:
+        with fitz.open(stream=file_bytes, filetype="pdf") as pdf:
+            return [
+                Document(page_content=page.get_text("text"), metadata={"page": page_number})
+                for page_number, page in enumerate(pdf)
+            ]
+    
+    reader = PdfReader(io.BytesIO(file_bytes))
+    return [
+        Document(page_content=page.extract_text() or "", metadata={"page": page_number})
+        for page_number, page in enumerate(reader.pages)
+    ]
+
+
+def _parse_text_bytes(file_bytes: bytes) -> List[Document]:
+    """Decode a UTF-8 text file straight from memory."""
+    return [Document(page_content=file_bytes.decode('utf-8'), metadata={})]
+
+
+def _parse_docx_bytes(file_bytes: bytes) -> List[Document]:
+    """Extract Word text from memory with docx2txt, or through Docx2txtLoader without it."""
+    if DOCX2TXT_AVAILABLE:
+        return [Document(page_content=docx2txt.process(io.BytesIO(file_bytes)), metadata={})]
+    return _load_from_temp_file(Docx2txtLoader, '.docx', file_bytes)
+
+
 class DocumentProcessor:
     """Handles multi-format document loading, processing, and text splitting."""
     
-    # Supported file formats and their corresponding loaders
+    # Supported file formats and the parsers turning their raw bytes into documents
     SUPPORTED_FORMATS = {
-        '.pdf': {'loader': PyPDFLoader, 'description': 'PDF documents'},
-        '.docx': {'loader': Docx2txtLoader, 'description': 'Word documents'},
-        '.xlsx': {'loader': UnstructuredExcelLoader, 'description': 'Excel spreadsheets'},
-        '.pptx': {'loader': UnstructuredPowerPointLoader, 'description': 'PowerPoint presentations'},
-        '.txt': {'loader': TextLoader, 'description': 'Text files'},
+        '.pdf': {'parser': _parse_pdf_bytes, 'description': 'PDF documents'},
+        '.docx': {'parser': _parse_docx_bytes, 'description': 'Word documents'},
+        '.xlsx': {'parser': partial(_load_from_temp_file, UnstructuredExcelLoader, '.xlsx'), 'description': 'Excel spreadsheets'},
+        '.pptx': {'parser': partial(_load_from_temp_file, UnstructuredPowerPointLoader, '.pptx'), 'description': 'PowerPoint presentations'},
+        '.txt': {'parser': _parse_text_bytes, 'description': 'Text files'},
     }
     
     def __init__(self):
         self.config = config_manager.app_config
+        # One splitter per process - the module-level instance below is shared by every rerun
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.config.CHUNK_SIZE,
-            chunk_overlap=self.config.CHUNK_OVERLAP
+            chunk_overlap=self.config.CHUNK_OVERLAP,
+            length_function=len,
+            separators=self.config.TEXT_SEPARATORS
         )
+        # Character-counted semchunk chunker, when selected and installed
+        self.chunker = None
+        if self.config.TEXT_SPLITTER == "semchunk" and SEMCHUNK_AVAILABLE:
+            self.chunker = semchunk.chunkerify(len, self.config.CHUNK_SIZE)
     
     def load_documents(self, uploaded_files: List) -> List[Document]:
         """
@@ -54,32 +270,95 @@ class DocumentProcessor:
         Raises:
             Exception: If document processing fails
         """
+        all_docs = []
+        for docs in self._iter_processed_files(uploaded_files):
+            all_docs.extend(docs)
+        return all_docs
+    
+    def load_and_split(self, uploaded_files: List) -> List[Document]:
+        """
+        Load uploaded files and split them into chunks in one pass.
+        
+        Each file's pages are split as soon as that file is parsed and then
+        dropped, so the full page list is never held alongside the chunks.
+        
+        Args:
+            uploaded_files (List): List of uploaded Streamlit file objects
+            
+        Returns:
+            List[Document]: List of document chunks with chunk metadata
+        """
+        chunks = list(self.iter_chunks(uploaded_files))
+        self._add_chunk_metadata(chunks)
+        return chunks
+    
+    def iter_chunks(self, uploaded_files: List) -> Iterator[Document]:
+        """
+        Lazily yield chunks from uploaded files, file by file.
+        
+        Args:
+            uploaded_files (List): List of uploaded Streamlit file objects
+            
+        Yields:
+            Document: Chunks in upload and page order (without chunk_id/total_chunks)
+        """
+        for docs in self._iter_processed_files(uploaded_files):
+            yield from self._iter_split(docs)
+    
+    def _iter_processed_files(self, uploaded_files: List) -> Iterator[List[Document]]:
+        """Parse files in parallel and yield each file's documents in upload order."""
         if not uploaded_files:
-            return []
+            return
         
-        all_docs = []
+        # Session state is only reachable from the script thread, so read it here
+        processed_at = str(st.session_state.get('processing_time', 'unknown'))
         
-        for uploaded_file in uploaded_files:
-            try:
-                docs = self._process_single_file(uploaded_file)
-                all_docs.extend(docs)
-                st.success(f"✅ Processed: {uploaded_file.name}")
-            except Exception as e:
-                st.error(f"❌ Failed to process {uploaded_file.name}: {str(e)}")
-                continue
+        # Parse files in parallel; map() keeps results in upload order
+        if self.config.PARALLEL_PARSING:
+            max_workers = min(self.config.MAX_PARSE_WORKERS, len(uploaded_files))
+        else:
+            max_workers = 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda uploaded_file: self._try_process_file(uploaded_file, processed_at),
+                uploaded_files
+            )
+            
+            # Report on the script thread - Streamlit elements cannot be created from workers
+            for uploaded_file, (docs, error) in zip(uploaded_files, results):
+                if error is None:
+                    st.success(f"✅ Processed: {uploaded_file.name}")
+                    yield docs
+                else:
+                    st.error(f"❌ Failed to process {uploaded_file.name}: {error}")
+    
+    def _try_process_file(self, uploaded_file, processed_at: str) -> Tuple[List[Document], Optional[str]]:
+        """
+        Process a single file, capturing any failure instead of raising.
         
-        return all_docs
+        Returns:
+            Tuple[List[Document], Optional[str]]: (documents, error_message)
+        """
+        try:
+            return self._process_single_file(uploaded_file, processed_at), None
+        except Exception as e:
+            return [], str(e)
     
-    def _process_single_file(self, uploaded_file) -> List[Document]:
+    def _process_single_file(self, uploaded_file, processed_at: Optional[str] = None) -> List[Document]:
         """
         Process a single document file (PDF, DOCX, XLSX, PPTX, or TXT).
         
         Args:
             uploaded_file: Streamlit uploaded file object
+            processed_at (Optional[str]): Processing timestamp for metadata;
+                read from session state when not given
             
         Returns:
             List[Document]: Extracted documents from the file
         """
+        if processed_at is None:
+            processed_at = str(st.session_state.get('processing_time', 'unknown'))
+        
         # Get file extension
         file_extension = Path(uploaded_file.name).suffix.lower()
         
@@ -87,41 +366,23 @@ class DocumentProcessor:
         if file_extension not in self.SUPPORTED_FORMATS:
             raise ValueError(f"Unsupported file format: {file_extension}. Supported formats: {', '.join(self.SUPPORTED_FORMATS.keys())}")
         
-        # Create temporary file with appropriate suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            tmp_file_path = tmp_file.name
+        # Read the upload once; the hash keys the parse cache across reruns
+        file_bytes = uploaded_file.getvalue()
+        docs = _parse_file_cached(compute_upload_digest(uploaded_file, file_bytes), file_extension, file_bytes)
+        del file_bytes
         
-        try:
-            # Get appropriate loader for the file type
-            loader_class = self.SUPPORTED_FORMATS[file_extension]['loader']
-            
-            # Handle different loader initialization patterns
-            if file_extension == '.txt':
-                # TextLoader needs encoding parameter for better compatibility
-                loader = loader_class(tmp_file_path, encoding='utf-8')
-            else:
-                loader = loader_class(tmp_file_path)
-            
-            # Load document content
-            docs = loader.load()
-            
-            # Add enhanced metadata
-            for doc in docs:
-                doc.metadata.update({
-                    "source_file": uploaded_file.name,
-                    "file_type": file_extension,
-                    "file_description": self.SUPPORTED_FORMATS[file_extension]['description'],
-                    "file_size": len(uploaded_file.getvalue()),
-                    "processed_at": str(st.session_state.get('processing_time', 'unknown'))
-                })
-            
-            return docs
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_file_path):
-                os.remove(tmp_file_path)
+        # Add enhanced metadata (size is known up front, no need to measure the bytes)
+        file_metadata = {
+            "source_file": uploaded_file.name,
+            "file_type": file_extension,
+            "file_description": self.SUPPORTED_FORMATS[file_extension]['description'],
+            "file_size": uploaded_file.size,
+            "processed_at": processed_at
+        }
+        for doc in docs:
+            doc.metadata.update(file_metadata)
+        
+        return docs
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
@@ -137,21 +398,42 @@ class DocumentProcessor:
             return []
         
         try:
-            split_docs = self.text_splitter.split_documents(documents)
-            
-            # Add chunk metadata
-            for i, doc in enumerate(split_docs):
-                doc.metadata.update({
-                    "chunk_id": i,
-                    "total_chunks": len(split_docs)
-                })
-            
+            split_docs = list(self._iter_split(documents))
+            self._add_chunk_metadata(split_docs)
             return split_docs
             
         except Exception as e:
             st.error(f"Error splitting documents: {str(e)}")
             return documents
     
+    def _iter_split(self, documents: List[Document]) -> Iterator[Document]:
+        """Split documents one at a time, yielding chunks that inherit the page metadata."""
+        if self.chunker is not None:
+            # One batched call per file instead of a splitter pass per page
+            texts_per_doc = self.chunker(
+                [doc.page_content for doc in documents],
+                overlap=self.config.CHUNK_OVERLAP
+            )
+            for doc, texts in zip(documents, texts_per_doc):
+                for text in texts:
+                    yield Document(page_content=text, metadata=dict(doc.metadata))
+            return
+        
+        for doc in documents:
+            for text in self.text_splitter.split_text(doc.page_content):
+                yield Document(page_content=text, metadata=dict(doc.metadata))
+    
+    @staticmethod
+    def _add_chunk_metadata(chunks: List[Document]) -> None:
+        """Number chunks and attach their content hashes."""
+        total_chunks = len(chunks)
+        for i, doc in enumerate(chunks):
+            doc.metadata.update({
+                "chunk_id": i,
+                "total_chunks": total_chunks,
+                "content_hash": compute_content_hash(doc.page_content)
+            })
+    
     def get_document_stats(self, documents: List[Document]) -> dict:
         """
         Get statistics about processed documents.
@@ -170,13 +452,14 @@ class DocumentProcessor:
                 "sources": []
             }
         
-        total_chars = sum(len(doc.page_content) for doc in documents)
-        sources = list(set(doc.metadata.get("source_file", "unknown") for doc in documents))
+        # Both maps run in C, without a Python-level generator; dict.fromkeys dedupes in first-seen order
+        total_chars = sum(map(len, map(attrgetter("page_content"), documents)))
+        sources = list(dict.fromkeys(doc.metadata.get("source_file", "unknown") for doc in documents))
         
         return {
             "total_docs": len(documents),
             "total_chars": total_chars,
-            "avg_doc_length": total_chars // len(documents) if documents else 0,
+            "avg_doc_length": total_chars // len(documents),
             "sources": sources
         }
     
@@ -23,7 +23,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import custom modules with absolute imports
 from Modular_App.config import config_manager
 from Modular_App.auth import auth_manager
-from Modular_App.document_processor import document_processor
+from Modular_App.document_processor import document_processor, compute_upload_digest
 from Modular_App.vector_store import vector_store_manager
 from Modular_App.chat_engine import chat_engine, conversation_manager
 from Modular_App.ui_components import ui_components
@@ -45,6 +45,7 @@ class GenAIChatbotApp:
         st.session_state.app_initialized = True
         st.session_state.current_db_type = None
         st.session_state.vector_db = None
+        st.session_state.vector_db_key = None
         conversation_manager.initialize_session_state()
     
     def run(self) -> None:
@@ -83,6 +84,9 @@ class GenAIChatbotApp:
             vector_store_manager.set_database_type(selected_db_type)
             st.session_state.current_db_type = selected_db_type
         
+        # Embedding backend selection
+        vector_store_manager.set_embedding_backend(ui_components.show_embedding_backend_selector())
+        
         # Show database management controls
         ui_components.show_database_management()
         
@@ -126,12 +130,37 @@ class GenAIChatbotApp:
             return self._load_existing_database()
         
         elif uploaded_files:
-            return self._process_documents(action, uploaded_files, storage_option, has_existing_db)
+            # Reuse the database built from these exact files on earlier reruns
+            upload_key = self._get_upload_key(action, uploaded_files, storage_option)
+            if st.session_state.vector_db_key == upload_key and st.session_state.vector_db is not None:
+                return st.session_state.vector_db
+            
+            db = self._process_documents(action, uploaded_files, storage_option, has_existing_db)
+            if db:
+                st.session_state.vector_db = db
+                st.session_state.vector_db_key = upload_key
+            return db
         
         else:
             st.info("👆 Please upload PDF files to continue.")
             return None
     
+    @staticmethod
+    def _get_upload_key(action: str, uploaded_files, storage_option: str) -> tuple:
+        """
+        Build a key identifying an upload selection by file content.
+        
+        Returns:
+            tuple: Action, storage, database type, embedding backend and per-file content digests
+        """
+        return (
+            action,
+            storage_option,
+            st.session_state.current_db_type,
+            vector_store_manager.embedding_backend,
+            tuple(compute_upload_digest(f) for f in uploaded_files)
+        )
+    
     def _load_existing_database(self):
         """Load existing vector database."""
         try:
@@ -165,17 +194,11 @@ class GenAIChatbotApp:
         try:
             # Process documents
             with st.spinner("Processing PDF documents..."):
-                documents = document_processor.load_documents(uploaded_files)
-                
-                if not documents:
-                    ui_components.show_error_message("No documents could be processed")
-                    return None
-                
-                # Split documents
-                docs = document_processor.split_documents(documents)
+                # Load and split file by file so parsed pages are not all kept in memory
+                docs = document_processor.load_and_split(uploaded_files)
                 
                 if not docs:
-                    ui_components.show_error_message("Document splitting failed")
+                    ui_components.show_error_message("No documents could be processed")
                     return None
             
             # Show processing status
@@ -251,7 +274,7 @@ class GenAIChatbotApp:
         """Update existing database with new documents."""
         with st.spinner("Adding documents to existing knowledge base..."):
             # Load existing database
-            existing_db = vector_store_manager.load_database()
+            existing_db = vector_store_manager.load_database(writable=True)
             
             if not existing_db:
                 ui_components.show_error_message("Failed to load existing database")
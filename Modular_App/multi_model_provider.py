@@ -3,15 +3,27 @@ Multi-model provider support for the GenAI Chatbot.
 Supports OpenAI, Anthropic, Google, and local model providers.
 """
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 import os
+import httpx
 
 # LangChain imports for different providers
-from langchain.chat_models import ChatOpenAI
-from langchain.embeddings import OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
 from langchain.schema import BaseMessage
+import numpy as np
 
 # Import providers with fallback handling
+# langchain-openai takes separate sync and async HTTP clients; the legacy
+# classes hand http_client to AsyncOpenAI too, so they get no shared client
+try:
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+    LANGCHAIN_OPENAI_AVAILABLE = True
+except ImportError:
+    from langchain.chat_models import ChatOpenAI
+    from langchain.embeddings import OpenAIEmbeddings
+    LANGCHAIN_OPENAI_AVAILABLE = False
+
 try:
     from langchain.chat_models import ChatAnthropic
     ANTHROPIC_AVAILABLE = True
@@ -36,9 +48,129 @@ try:
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 from .config import config_manager
 
 
+def _http_transport_kwargs() -> Dict[str, Any]:
+    """Connection-pool settings shared by the sync and async transports."""
+    model_config = config_manager.model_config
+    # httpx ignores Client-level pool settings when a transport is given,
+    # so the limits and HTTP/2 switch belong on the transport
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "limits": httpx.Limits(
+            max_connections=model_config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=model_config.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        "retries": model_config.HTTP_CONNECT_RETRIES
+    }
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    """
+    Get the process-wide HTTP client shared by OpenAI chat and embedding models.
+    
+    Keeping one pooled client (HTTP/2 when ``h2`` is installed) lets every
+    request reuse warm keep-alive connections instead of paying a new TCP and
+    TLS handshake, and multiplexes concurrent embedding batches.
+    """
+    return httpx.Client(
+        timeout=config_manager.model_config.HTTP_TIMEOUT_SECONDS,
+        transport=httpx.HTTPTransport(**_http_transport_kwargs())
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the process-wide async counterpart of get_http_client()."""
+    return httpx.AsyncClient(
+        timeout=config_manager.model_config.HTTP_TIMEOUT_SECONDS,
+        transport=httpx.AsyncHTTPTransport(**_http_transport_kwargs())
+    )
+
+
+def get_openai_client_kwargs() -> Dict[str, Any]:
+    """
+    Get the shared HTTP clients to pass to ChatOpenAI / OpenAIEmbeddings.
+    
+    Returns:
+        Dict[str, Any]: ``http_client`` and ``http_async_client`` with
+            langchain-openai; empty with the legacy classes, which would pass
+            a sync client to AsyncOpenAI and fail
+    """
+    if not LANGCHAIN_OPENAI_AVAILABLE:
+        return {}
+    return {
+        "http_client": get_http_client(),
+        "http_async_client": get_async_http_client()
+    }
+
+
+class ONNXEmbeddings(Embeddings):
+    """
+    Local sentence embeddings served by ONNX Runtime (int8-quantized by default).
+    
+    Runs an E5-style encoder on the CPU with mean pooling and L2
+    normalization, so no network call is made per chunk. Plugs in anywhere
+    LangChain embeddings are accepted.
+    """
+    
+    def __init__(self, model_name: str, file_name: str, batch_size: int = 64):
+        if not ONNX_AVAILABLE:
+            raise ImportError("optimum[onnxruntime] package not installed")
+        
+        self.model = model_name
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.encoder = ORTModelForFeatureExtraction.from_pretrained(
+            model_name,
+            file_name=file_name,
+            provider="CPUExecutionProvider"
+        )
+    
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Encode texts in fixed-size batches."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np"
+            )
+            hidden = self.encoder(**inputs).last_hidden_state
+            
+            # Mean-pool over real tokens, then normalize for cosine/L2 search
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12
+            vectors.extend(pooled.astype(np.float32).tolist())
+        return vectors
+    
+    def embed_documents(self, texts: List[str], chunk_size: int = 0) -> List[List[float]]:
+        """Embed document chunks (E5 expects the 'passage: ' prefix)."""
+        return self._embed([f"passage: {text}" for text in texts])
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query (E5 expects the 'query: ' prefix)."""
+        return self._embed([f"query: {text}"])[0]
+
+
 class ModelProvider(ABC):
     """Abstract base class for model providers."""
     
@@ -67,14 +199,16 @@ class OpenAIProvider(ModelProvider):
             model_name=model_name,
             openai_api_key=os.getenv("OPENAI_API_KEY"),
             temperature=kwargs.get("temperature", 0.1),
-            max_tokens=kwargs.get("max_tokens", 1000)
+            max_tokens=kwargs.get("max_tokens", 1000),
+            **get_openai_client_kwargs()
         )
     
     def get_embedding_model(self, model_name: str, **kwargs) -> OpenAIEmbeddings:
         """Get OpenAI embedding model."""
         return OpenAIEmbeddings(
             model=model_name,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            **get_openai_client_kwargs()
         )
     
     def is_available(self) -> bool:
@@ -6,7 +6,7 @@ import streamlit as st
 from .config import config_manager
 from .document_processor import document_processor
 from .vector_store import vector_store_manager
-from .chat_engine import conversation_manager
+from .chat_engine import conversation_manager, StreamlitTokenHandler
 
 
 class UIComponents:
@@ -56,6 +56,26 @@ class UIComponents:
         
         return db_type.lower().replace("db", "")
     
+    @staticmethod
+    def show_embedding_backend_selector() -> str:
+        """
+        Show embedding backend selector.
+        
+        Returns:
+            str: Selected backend key ('openai' or 'local')
+        """
+        backends = config_manager.model_config.EMBEDDING_BACKENDS
+        
+        backend = st.sidebar.radio(
+            "Embedding backend:",
+            list(backends.keys()),
+            format_func=lambda key: backends[key],
+            help="OpenAI: hosted embeddings. Local: int8 ONNX model on CPU, no API calls. "
+                 "Each backend keeps its own knowledge base."
+        )
+        
+        return backend
+    
     @staticmethod
     def show_action_selector(has_existing_db: bool) -> str:
         """
@@ -187,9 +207,9 @@ class UIComponents:
         # Initialize conversation manager
         conversation_manager.initialize_session_state()
         
-        # Initialize chat engine if not ready
+        # Build the chain once per session and knowledge base; reruns reuse it
         chat_engine = st.session_state.chat_engine
-        if not chat_engine.is_ready():
+        if not chat_engine.is_ready(vector_db):
             chat_engine.initialize_chain(vector_db)
         
         # Display knowledge base info
@@ -218,9 +238,18 @@ class UIComponents:
             
             # Generate and display assistant response
             with st.chat_message("assistant"):
+                # Tokens stream into the placeholder; the final answer replaces them
+                placeholder = st.empty()
                 with st.spinner("🤔 Thinking..."):
-                    response = chat_engine.get_response(user_question)
-                st.write(response)
+                    try:
+                        response = chat_engine.get_response(
+                            user_question,
+                            callbacks=[StreamlitTokenHandler(placeholder)]
+                        )
+                    except Exception as e:
+                        st.error(f"Error generating response: {str(e)}")
+                        response = "I apologize, but I encountered an error while processing your question. Please try again."
+                placeholder.write(response)
                 
                 # Add assistant message to history
                 conversation_manager.add_message("assistant", response)
@@ -253,6 +282,12 @@ class UIComponents:
                     file_name="conversation_export.txt",
                     mime="text/plain"
                 )
+                st.sidebar.download_button(
+                    label="💾 Download as JSON",
+                    data=conversation_manager.export_conversation_bytes(),
+                    file_name="conversation_export.json",
+                    mime="application/json"
+                )
     
     @staticmethod
     def show_database_management() -> None:
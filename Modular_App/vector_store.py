@@ -1,17 +1,162 @@
 """
 Vector store module supporting both FAISS and ChromaDB backends.
 """
+import math
 import os
+import pickle
 import shutil
+import uuid
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Set
+import faiss
+import numpy as np
 import streamlit as st
 
-from langchain.embeddings import OpenAIEmbeddings
+from langchain.docstore.in_memory import InMemoryDocstore
 from langchain.vectorstores import FAISS, Chroma
 from langchain.schema import Document
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from .config import config_manager
+from .document_processor import compute_content_hash
+from .multi_model_provider import ONNXEmbeddings, OpenAIEmbeddings, get_openai_client_kwargs
+
+
+@st.cache_resource(show_spinner=False)
+def _get_embeddings_cached(api_key: str, model: str, batch_size: int, max_retries: int) -> OpenAIEmbeddings:
+    """Create the OpenAI embeddings client once per configuration and share it across reruns."""
+    return OpenAIEmbeddings(
+        openai_api_key=api_key,
+        model=model,
+        chunk_size=batch_size,
+        max_retries=max_retries,
+        **get_openai_client_kwargs()
+    )
+
+
+def _read_faiss(path: str, embeddings, mmap: bool) -> FAISS:
+    """
+    Read a FAISS store written by ``FAISS.save_local``.
+    
+    The index is read with ``faiss.read_index`` so it can be memory-mapped
+    read-only, letting the OS page in only what queries touch. The docstore
+    and id mapping come from the ``index.pkl`` sidecar LangChain writes.
+    """
+    io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    index = faiss.read_index(os.path.join(path, "index.faiss"), io_flags)
+    
+    with open(os.path.join(path, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _get_local_embeddings_cached(model_name: str, file_name: str, batch_size: int) -> ONNXEmbeddings:
+    """Load the local ONNX encoder once per process."""
+    return ONNXEmbeddings(model_name, file_name, batch_size)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_faiss_cached(path: str, index_mtime: float, embedding_model: str, _embeddings) -> FAISS:
+    """
+    Load a read-only, memory-mapped FAISS index once per on-disk version.
+    
+    The index file's modification time is part of the cache key, so a save
+    from this or another process (e.g. the REST API) invalidates the entry.
+    """
+    return _read_faiss(path, _embeddings, mmap=True)
+
+
+def _embed_batch(embeddings, batch: List[str]) -> List[List[float]]:
+    """
+    Embed one batch of texts in a single request.
+    
+    Rate limits are retried by the OpenAI client itself (``max_retries`` on
+    the embeddings instance, which honors ``Retry-After``), so there is no
+    second retry loop here.
+    """
+    return embeddings.embed_documents(batch, chunk_size=len(batch))
+
+
+def embed_texts_concurrently(embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts in fixed-size batches with several batches in flight.
+    
+    Args:
+        embeddings: LangChain embeddings instance
+        texts (List[str]): Texts to embed
+        
+    Returns:
+        List[List[float]]: One vector per input text, in input order
+    """
+    config = config_manager.vector_config
+    batch_size = config.EMBEDDING_BATCH_SIZE
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    
+    if len(batches) <= 1:
+        return _embed_batch(embeddings, texts) if texts else []
+    
+    max_workers = min(config.MAX_CONCURRENT_EMBEDDING_BATCHES, len(batches))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # map() yields results in submission order, so vectors stay aligned with texts
+        results = executor.map(lambda batch: _embed_batch(embeddings, batch), batches)
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _l2norm_rows(vectors):
+        """Numba kernel: L2-normalize each row (compiled once, cached on disk)."""
+        n, d = vectors.shape
+        out = np.empty_like(vectors)
+        for i in prange(n):
+            total = 0.0
+            for j in range(d):
+                total += vectors[i, j] * vectors[i, j]
+            inv = 1.0 / math.sqrt(total + 1e-12)
+            for j in range(d):
+                out[i, j] = vectors[i, j] * inv
+        return out
+else:
+    def _l2norm_rows(vectors):
+        """NumPy fallback: L2-normalize each row."""
+        return vectors / np.sqrt((vectors * vectors).sum(axis=1, keepdims=True) + 1e-12)
+
+
+def l2_normalize_rows(vectors) -> np.ndarray:
+    """
+    L2-normalize embedding rows into a contiguous float32 matrix.
+    
+    Uses a parallel Numba kernel when numba is installed, NumPy otherwise.
+    Normalized vectors make L2 search rank results by cosine similarity.
+    
+    Args:
+        vectors: (N, D) array-like of embeddings
+        
+    Returns:
+        np.ndarray: Normalized (N, D) float32 matrix
+    """
+    matrix = np.ascontiguousarray(vectors, dtype="float32")
+    if matrix.size == 0:
+        return matrix
+    return _l2norm_rows(matrix)
+
+
+def _document_hash(doc: Document) -> str:
+    """Return the chunk's content hash, computing it for documents split before hashing existed."""
+    return doc.metadata.get("content_hash") or compute_content_hash(doc.page_content)
 
 
 class VectorStoreInterface(ABC):
@@ -23,8 +168,8 @@ class VectorStoreInterface(ABC):
         pass
     
     @abstractmethod
-    def load_local(self, path: str, embeddings) -> Any:
-        """Load vector store from local storage."""
+    def load_local(self, path: str, embeddings, writable: bool = False) -> Any:
+        """Load vector store from local storage (writable if it will be modified)."""
         pass
     
     @abstractmethod
@@ -56,28 +201,184 @@ class VectorStoreInterface(ABC):
 class FAISSVectorStore(VectorStoreInterface):
     """FAISS vector store implementation."""
     
+    def __init__(self):
+        self.config = config_manager.vector_config
+    
     def create_from_documents(self, documents: List[Document], embeddings) -> FAISS:
-        """Create FAISS vector store from documents."""
-        return FAISS.from_documents(documents, embeddings)
+        """Create FAISS vector store from documents using concurrent batched embedding."""
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        vectors = embed_texts_concurrently(embeddings, texts)
+        return self._build_store(texts, vectors, metadatas, embeddings)
+    
+    def _create_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Create and train a FAISS index of the configured type and encoding.
+        
+        ``fp16`` stores vectors as half floats (half the memory and disk of
+        ``fp32`` with negligible recall loss). ``pq`` uses an IVF-PQ index,
+        which needs at least ``FAISS_IVF_NLIST`` training vectors; smaller
+        inputs fall back to ``fp16``.
+        """
+        dimension = vectors.shape[1]
+        encoding = self.config.FAISS_VECTOR_ENCODING.lower()
+        
+        if encoding == "pq":
+            if len(vectors) >= self.config.FAISS_IVF_NLIST and dimension % self.config.FAISS_PQ_M == 0:
+                quantizer = faiss.IndexFlatL2(dimension)
+                index = faiss.IndexIVFPQ(
+                    quantizer, dimension, self.config.FAISS_IVF_NLIST,
+                    self.config.FAISS_PQ_M, self.config.FAISS_PQ_NBITS
+                )
+                index.train(vectors)
+                index.nprobe = self.config.FAISS_IVF_NPROBE
+                # Needed for reconstruct() when merging databases
+                index.make_direct_map()
+                return index
+            encoding = "fp16"
+        
+        if self.config.FAISS_INDEX_TYPE.lower() == "hnsw":
+            if encoding == "fp16":
+                index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, self.config.FAISS_HNSW_M)
+            else:
+                index = faiss.IndexHNSWFlat(dimension, self.config.FAISS_HNSW_M)
+            index.hnsw.efConstruction = self.config.FAISS_HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.config.FAISS_HNSW_EF_SEARCH
+        elif encoding == "fp16":
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16)
+        else:
+            index = faiss.IndexFlatL2(dimension)
+        
+        if not index.is_trained:
+            index.train(vectors)
+        return index
+    
+    def _build_store(self, texts: List[str], vectors: List[List[float]],
+                     metadatas: List[dict], embeddings) -> FAISS:
+        """Wrap precomputed vectors in a LangChain FAISS store backed by the configured index."""
+        if not vectors:
+            raise ValueError("Cannot build a FAISS index without any vectors")
+        
+        matrix = l2_normalize_rows(vectors)
+        index = self._create_index(matrix)
+        index.add(matrix)
+        
+        doc_ids = [str(uuid.uuid4()) for _ in texts]
+        docstore = InMemoryDocstore({
+            doc_id: Document(page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(doc_ids, texts, metadatas)
+        })
+        
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=dict(enumerate(doc_ids))
+        )
     
-    def load_local(self, path: str, embeddings) -> FAISS:
-        """Load FAISS vector store from local storage."""
-        try:
-            # Try with allow_dangerous_deserialization parameter (newer LangChain versions)
-            return FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
-        except TypeError:
-            # Fall back to older method without the parameter
-            return FAISS.load_local(path, embeddings)
+    def load_local(self, path: str, embeddings, writable: bool = False) -> FAISS:
+        """
+        Load FAISS vector store from local storage.
+        
+        Read-only loads are memory-mapped and cached across reruns; writable
+        loads read a private in-memory copy that can be added to and saved.
+        """
+        if writable:
+            db = _read_faiss(path, embeddings, mmap=False)
+        else:
+            index_file = os.path.join(path, "index.faiss")
+            index_mtime = os.path.getmtime(index_file) if os.path.exists(index_file) else 0.0
+            embedding_model = getattr(embeddings, "model", "")
+            db = _load_faiss_cached(path, index_mtime, embedding_model, embeddings)
+        
+        # Apply the current search breadth to HNSW / IVF indexes
+        if hasattr(db.index, "hnsw"):
+            db.index.hnsw.efSearch = self.config.FAISS_HNSW_EF_SEARCH
+        if hasattr(db.index, "nprobe"):
+            db.index.nprobe = self.config.FAISS_IVF_NPROBE
+        return db
     
     def save_local(self, db: FAISS, path: str) -> None:
-        """Save FAISS vector store to local storage."""
+        """Save FAISS vector store and its content-hash sidecar to local storage."""
         db.save_local(path)
+        
+        # Record which index the hashes describe, so a save that skips the
+        # sidecar (e.g. the legacy app) is detected instead of trusted
+        sidecar = {
+            "index_mtime": os.path.getmtime(os.path.join(path, "index.faiss")),
+            "ntotal": db.index.ntotal,
+            "hashes": self.collect_content_hashes(db)
+        }
+        with open(self._hashes_path(path), "wb") as f:
+            pickle.dump(sidecar, f)
+    
+    def get_content_hashes(self, db: FAISS, path: Optional[str] = None) -> Set[str]:
+        """
+        Get hashes of chunks already indexed, preferring the on-disk sidecar.
+        
+        Args:
+            db (FAISS): Loaded vector store
+            path (Optional[str]): Directory the store was loaded from, if any
+            
+        Returns:
+            Set[str]: Content hashes; recomputed from the docstore when the
+                sidecar is missing or does not match the index on disk
+        """
+        if path is not None:
+            try:
+                with open(self._hashes_path(path), "rb") as f:
+                    sidecar = pickle.load(f)
+                index_mtime = os.path.getmtime(os.path.join(path, "index.faiss"))
+                if (isinstance(sidecar, dict)
+                        and sidecar.get("index_mtime") == index_mtime
+                        and sidecar.get("ntotal") == db.index.ntotal):
+                    return sidecar["hashes"]
+            except Exception:
+                pass
+        return self.collect_content_hashes(db)
+    
+    @staticmethod
+    def _hashes_path(path: str) -> str:
+        """Get the content-hash sidecar path for the store saved at ``path``."""
+        return os.path.join(path, config_manager.app_config.CONTENT_HASHES_FILE)
+    
+    @staticmethod
+    def collect_content_hashes(db: FAISS) -> Set[str]:
+        """Compute hashes of every chunk in the store's docstore."""
+        return {_document_hash(doc) for doc in db.docstore._dict.values()}
     
     def merge_databases(self, existing_db: FAISS, new_db: FAISS) -> FAISS:
-        """Merge two FAISS databases."""
-        existing_db.merge_from(new_db)
+        """
+        Merge two FAISS databases.
+        
+        HNSW indexes do not support ``merge_from``, so the new vectors are
+        reconstructed and added to the existing index instead.
+        """
+        count = new_db.index.ntotal
+        if count == 0:
+            return existing_db
+        
+        vectors = new_db.index.reconstruct_n(0, count)
+        docs = [new_db.docstore.search(new_db.index_to_docstore_id[i]) for i in range(count)]
+        existing_db.add_embeddings(
+            list(zip([doc.page_content for doc in docs], vectors.tolist())),
+            metadatas=[doc.metadata for doc in docs]
+        )
         return existing_db
     
+    def add_documents(self, db: FAISS, documents: List[Document], embeddings) -> FAISS:
+        """Embed documents and insert them into an existing FAISS store in place."""
+        if not documents:
+            return db
+        
+        texts = [doc.page_content for doc in documents]
+        vectors = l2_normalize_rows(embed_texts_concurrently(embeddings, texts))
+        db.add_embeddings(
+            list(zip(texts, vectors.tolist())),
+            metadatas=[doc.metadata for doc in documents]
+        )
+        return db
+    
     def get_document_count(self, db: FAISS) -> int:
         """Get number of documents in FAISS database."""
         if hasattr(db, 'index') and db.index is not None:
@@ -116,7 +417,7 @@ class ChromaDBVectorStore(VectorStoreInterface):
             persist_directory=self.config.CHROMA_PERSIST_DIR
         )
     
-    def load_local(self, path: str, embeddings) -> Chroma:
+    def load_local(self, path: str, embeddings, writable: bool = False) -> Chroma:
         """Load Chroma vector store from local storage."""
         return Chroma(
             embedding_function=embeddings,
@@ -169,6 +470,7 @@ class VectorStoreManager:
         self.chroma_store = ChromaDBVectorStore()
         self.current_store = None
         self.current_db_type = None
+        self.embedding_backend = "openai"
     
     def set_database_type(self, db_type: str) -> None:
         """Set the current database type (faiss or chroma)."""
@@ -181,15 +483,31 @@ class VectorStoreManager:
         else:
             raise ValueError(f"Unsupported database type: {db_type}")
     
-    def get_embeddings(self) -> OpenAIEmbeddings:
-        """Get OpenAI embeddings instance."""
+    def set_embedding_backend(self, backend: str) -> None:
+        """Set the embedding backend (openai or local)."""
+        if backend.lower() not in self.config.model_config.EMBEDDING_BACKENDS:
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+        self.embedding_backend = backend.lower()
+    
+    def get_embeddings(self) -> Any:
+        """Get embeddings instance for the current backend."""
+        if self.embedding_backend == "local":
+            model_config = self.config.model_config
+            return _get_local_embeddings_cached(
+                model_config.LOCAL_EMBEDDING_MODEL,
+                model_config.LOCAL_EMBEDDING_FILE,
+                model_config.LOCAL_EMBEDDING_BATCH_SIZE
+            )
+        
         api_key = self.config.get_openai_api_key()
         if not api_key:
             raise ValueError("OpenAI API key not found")
         
-        return OpenAIEmbeddings(
-            openai_api_key=api_key,
-            model=self.config.get_embedding_model()
+        return _get_embeddings_cached(
+            api_key,
+            self.config.get_embedding_model(),
+            self.config.vector_config.EMBEDDING_BATCH_SIZE,
+            self.config.vector_config.EMBEDDING_MAX_RETRIES
         )
     
     def create_database(self, documents: List[Document]) -> Any:
@@ -198,14 +516,20 @@ class VectorStoreManager:
             raise ValueError("Database type not set. Call set_database_type() first.")
         
         embeddings = self.get_embeddings()
-        return self.current_store.create_from_documents(documents, embeddings)
+        return self.current_store.create_from_documents(self.filter_new_documents(documents, set()), embeddings)
     
-    def load_database(self) -> Optional[Any]:
-        """Load existing vector database."""
+    def load_database(self, writable: bool = False) -> Optional[Any]:
+        """
+        Load existing vector database.
+        
+        Args:
+            writable (bool): Load a private copy that can be modified and saved,
+                instead of the shared read-only (memory-mapped) instance
+        """
         if not self.current_store:
             raise ValueError("Database type not set. Call set_database_type() first.")
         
-        paths = self.config.get_vector_db_paths()
+        paths = self.config.get_vector_db_paths(self.embedding_backend)
         
         if self.current_db_type == "faiss":
             path = paths["faiss_path"]
@@ -217,7 +541,7 @@ class VectorStoreManager:
         
         try:
             embeddings = self.get_embeddings()
-            return self.current_store.load_local(path, embeddings)
+            return self.current_store.load_local(path, embeddings, writable=writable)
         except Exception as e:
             st.error(f"Error loading {self.current_db_type.upper()} database: {str(e)}")
             return None
@@ -227,7 +551,7 @@ class VectorStoreManager:
         if not self.current_store:
             raise ValueError("Database type not set. Call set_database_type() first.")
         
-        paths = self.config.get_vector_db_paths()
+        paths = self.config.get_vector_db_paths(self.embedding_backend)
         
         if self.current_db_type == "faiss":
             path = paths["faiss_path"]
@@ -250,9 +574,39 @@ class VectorStoreManager:
             existing_db.add_documents(new_documents)
             return existing_db
         else:
-            # For FAISS, create new database and merge
-            new_db = self.current_store.create_from_documents(new_documents, embeddings)
-            return self.current_store.merge_databases(existing_db, new_db)
+            # For FAISS, skip chunks that are already indexed, then embed and insert the rest
+            faiss_path = self.config.get_vector_db_paths(self.embedding_backend)["faiss_path"]
+            known_hashes = self.current_store.get_content_hashes(existing_db, faiss_path)
+            unique_documents = self.filter_new_documents(new_documents, known_hashes)
+            
+            skipped = len(new_documents) - len(unique_documents)
+            if skipped:
+                st.info(f"Skipped {skipped} chunk(s) already in the knowledge base")
+            
+            if not unique_documents:
+                return existing_db
+            return self.current_store.add_documents(existing_db, unique_documents, embeddings)
+    
+    @staticmethod
+    def filter_new_documents(documents: List[Document], known_hashes: Set[str]) -> List[Document]:
+        """
+        Drop chunks whose content is already indexed or repeated within the batch.
+        
+        Args:
+            documents (List[Document]): Candidate chunks
+            known_hashes (Set[str]): Content hashes already in the database
+            
+        Returns:
+            List[Document]: Chunks that still need embedding
+        """
+        seen = set(known_hashes)
+        unique_documents = []
+        for doc in documents:
+            content_hash = _document_hash(doc)
+            if content_hash not in seen:
+                seen.add(content_hash)
+                unique_documents.append(doc)
+        return unique_documents
     
     def get_document_count(self, db: Any) -> int:
         """Get number of documents in database."""
@@ -265,7 +619,7 @@ class VectorStoreManager:
         if not self.current_store:
             return False
         
-        paths = self.config.get_vector_db_paths()
+        paths = self.config.get_vector_db_paths(self.embedding_backend)
         
         if self.current_db_type == "faiss":
             return self.current_store.exists(paths["faiss_path"])
@@ -277,7 +631,7 @@ class VectorStoreManager:
         if not self.current_store:
             return False
         
-        paths = self.config.get_vector_db_paths()
+        paths = self.config.get_vector_db_paths(self.embedding_backend)
         
         if self.current_db_type == "faiss":
             return self.current_store.delete(paths["faiss_path"])
@@ -286,7 +640,7 @@ class VectorStoreManager:
     
     def get_database_info(self) -> Dict[str, Any]:
         """Get information about current database setup."""
-        paths = self.config.get_vector_db_paths()
+        paths = self.config.get_vector_db_paths(self.embedding_backend)
         
         return {
             "current_type": self.current_db_type,
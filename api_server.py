@@ -9,17 +9,9 @@ import os
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-# Import the FastAPI app from the Modular_App package
-from Modular_App.api import app
+# Import the API server entry point from the Modular_App package
+from Modular_App.api import serve
 
 if __name__ == "__main__":
-    import uvicorn
-    
-    # Start the server
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        reload_dirs=[project_root]
-    )
\ No newline at end of file
+    # Start the server (API_HOST, API_PORT, API_RELOAD and API_WORKERS are read from the environment)
+    serve()
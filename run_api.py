@@ -7,6 +7,8 @@ with the correct module structure, avoiding relative import issues.
 
 Usage:
     python run_api.py
+    API_RELOAD=1 python run_api.py      # auto-reload for development
+    API_WORKERS=4 python run_api.py     # multiple worker processes
 
 Alternative usage with uvicorn:
     uvicorn Modular_App.api:app --reload --host 0.0.0.0 --port 8000
@@ -14,7 +16,6 @@ Alternative usage with uvicorn:
 
 import os
 import sys
-import uvicorn
 from pathlib import Path
 
 # Add the current directory to Python path
@@ -22,14 +23,8 @@ current_dir = Path(__file__).parent.absolute()
 sys.path.insert(0, str(current_dir))
 
 if __name__ == "__main__":
-    # Import the FastAPI app
-    from Modular_App.api import app
+    # Import the API server entry point
+    from Modular_App.api import serve
     
-    # Run the server
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    # Run the server (set API_RELOAD=1 for auto-reload during development)
+    serve()